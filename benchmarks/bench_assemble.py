@@ -0,0 +1,44 @@
+"""
+Times reassembling translated tokens by joining slices against splicing them
+into a list of the characters of the payload, which `assemble` replaced.
+
+    python benchmarks/bench_assemble.py
+"""
+from timeit import repeat
+
+from discord.ext.i18n.preprocess import TranslationAgent
+
+PAYLOADS = {
+    "message": "Hello **there**, vote on the `poll` below! " * 4,
+    "embed": "A **long** description with _many_ `decorated` (segments). " * 60,
+    "huge": "Line of text with a **bold** phrase and a `code` span.\n" * 700,
+}
+
+
+def splice(payload: str, tokens, translations):
+    new_str = list(payload)
+    mitigate = 0
+    for tk, phrase in zip(tokens, translations):
+        new_str[tk["start_pos"] + mitigate : tk["end_pos"] + mitigate] = phrase
+        if tk["end_pos"] - tk["start_pos"] != len(phrase):
+            mitigate += len(phrase) - (tk["end_pos"] - tk["start_pos"])
+    return "".join(new_str)
+
+
+def main():
+    print(f"{'payload':<8} {'chars':>6} {'tokens':>6} {'splice ms':>9} {'join ms':>9}")
+    for name, payload in PAYLOADS.items():
+        tokens = TranslationAgent.tokenize(payload)
+        translations = [tk.phrase.upper() * 2 for tk in tokens]
+        spliced, joined = (
+            min(repeat(lambda: fn(payload, tokens, translations), number=5)) / 5 * 1000
+            for fn in (splice, TranslationAgent.assemble)
+        )
+        print(
+            f"{name:<8} {len(payload):>6} {len(tokens):>6}"
+            f" {spliced:>9.3f} {joined:>9.3f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,35 @@
+"""
+Times identifying the language of messages of growing length without and
+with the bounds on the characters and n-grams that are scored.
+
+    python benchmarks/bench_identify.py
+"""
+from timeit import repeat
+
+from discord.ext.i18n.identify import LanguageIdentifier
+
+MESSAGES = {
+    "english": "Hello there, how are you doing today? Welcome to the server! ",
+    "spanish": "Gracias por votar en la encuesta y bienvenidos al servidor. ",
+    "russian": "Привет всем, спасибо что проголосовали в нашем опросе сегодня. ",
+}
+
+
+def main():
+    unbounded = LanguageIdentifier(max_chars=10**9, max_grams=10**9)
+    bounded = LanguageIdentifier()
+    print(f"{'message':<8} {'chars':>6} {'full ms':>9} {'bounded ms':>10}")
+    for name, message in MESSAGES.items():
+        for repeats in (1, 10, 40, 65):
+            text = message * repeats
+            full, start = (
+                min(repeat(lambda: identifier.classify(text), number=5, repeat=3))
+                / 5
+                * 1000
+                for identifier in (unbounded, bounded)
+            )
+            print(f"{name:<8} {len(text):>6} {full:>9.3f} {start:>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Times matching decoratives with the trie against the scan over
+`similar_decors` that it replaced, then the compiled scanner against the
+original tokenizer loop, on the messages where tokenizing was slowest.
+
+    python benchmarks/bench_tokenize.py
+"""
+from string import ascii_letters
+from timeit import repeat
+
+from discord.ext.i18n.preprocess import TranslationAgent
+
+MESSAGES = {
+    "long": (
+        "The quick brown fox jumps over the lazy dog, then **naps** in the sun "
+        "for a while before `running` back home. "
+    )
+    * 40,
+    "punctuation": "**bold** _it_ `code` (aside) <@1234> <#5678> !!! ??? ... -- "
+    * 40,
+    "non-latin": "こんにちは、世界！**太字** と `コード` を含むメッセージです。" * 40,
+    "codeblocks": "```py\nprint('hi')\n``` and ```js\nconsole.log(1)\n``` " * 40,
+}
+
+
+def legacy_match(string: str, i: int):
+    char = tmp_char = string[i]
+    tmp_pos = i
+    string_len = len(string)
+    sample = TranslationAgent.similar_decors(char)
+    while sample and i + 1 != string_len:
+        i += 1
+        char += string[i]
+        sample = TranslationAgent.similar_decors(char)
+    if i + 1 != string_len:
+        char = char[:-1]
+        i -= 1
+    if char not in TranslationAgent.decoratives:
+        char = tmp_char
+        i = tmp_pos
+    return char, i
+
+
+def match_all(match, string: str):
+    for i, char in enumerate(string):
+        if char not in ascii_letters:
+            match(string, i)
+
+
+def header(*columns: str):
+    print(f"{'message':<12} {'chars':>6} " + " ".join(f"{c:>9}" for c in columns))
+
+
+def main():
+    header("filter ms", "trie ms", "speedup")
+    trie = TranslationAgent.compile_decoratives()[0]
+
+    def trie_match(string: str, i: int):
+        # The tokenizers compile the trie once per string
+        return TranslationAgent.match_decor(string, i, trie)
+
+    for name, message in MESSAGES.items():
+        timings = []
+        for match in (legacy_match, trie_match):
+            timings.append(
+                min(repeat(lambda: match_all(match, message), number=5, repeat=3))
+                / 5
+                * 1000
+            )
+        filtered, matched = timings
+        print(
+            f"{name:<12} {len(message):>6} {filtered:>9.2f} {matched:>9.3f}"
+            f" {filtered / matched:>8.0f}x"
+        )
+
+    print()
+    header("loop ms", "scan ms", "speedup")
+    for name, message in MESSAGES.items():
+        loop, scan = (
+            min(repeat(lambda: tokenize(message), number=5, repeat=3)) / 5 * 1000
+            for tokenize in (TranslationAgent.legacy_tokenize, TranslationAgent.scan)
+        )
+        print(
+            f"{name:<12} {len(message):>6} {loop:>9.3f} {scan:>9.3f}"
+            f" {loop / scan:>8.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -4,3 +4,5 @@ from .agent import *
 from .preprocess import *
 from .language import *
 from .cache import *
+from .identify import *
+from .translators import *
@@ -9,11 +9,14 @@ from discord.interactions import InteractionResponse
 from discord.webhook.async_ import AsyncWebhookAdapter, WebhookMessage
 from discord.ui import Modal
 
+from discord.ext.i18n.cache import Cache
 from discord.ext.i18n.language import Language
 from discord.ext.i18n.preprocess import (
+    AsyncTranslator,
     TranslationAgent,
     Translator,
 )
+from discord.ext.i18n.translators import CatalogTranslator
 
 Messageable_send = Messageable.send
 Message_edit = Message.edit
@@ -59,7 +62,7 @@ def wrap_i18n_editer(edit_func: InterfaceOverridable):
     return wrapped_i18n_edit
 
 
-def i18n_HTTPClient_edit_message(
+async def i18n_HTTPClient_edit_message(
     self: HTTPClient, channel_id: Snowflake, message_id: Snowflake, **fields: Any
 ):
     """
@@ -72,10 +75,10 @@ def i18n_HTTPClient_edit_message(
     if fields["content"]:
         content, lang = TranslationAgent.decode_lang_str(fields["content"])
         if lang:
-            fields, fields["content"] = TranslationAgent.translate_payload(
+            fields, fields["content"] = await TranslationAgent.translate_payload(
                 lang, fields, content, **AutoI18nAgent.get_config()
             )
-    return HTTPClient_edit_message(self, channel_id, message_id, **fields)
+    return await HTTPClient_edit_message(self, channel_id, message_id, **fields)
 
 
 def wrap_i18n_sender(send_func: InterfaceOverridable):
@@ -99,7 +102,7 @@ def wrap_i18n_sender(send_func: InterfaceOverridable):
     return wrapped_i18n_send
 
 
-def i18n_HTTPClient_send_message(
+async def i18n_HTTPClient_send_message(
     self: HTTPClient,
     channel_id: Snowflake,
     content: Optional[str],
@@ -113,13 +116,15 @@ def i18n_HTTPClient_send_message(
     if content:
         payload, lang = TranslationAgent.decode_lang_str(content)
         if lang:
-            kwds, content = TranslationAgent.translate_payload(
+            kwds, content = await TranslationAgent.translate_payload(
                 lang, kwds, payload, **AutoI18nAgent.get_config()
             )
-    return HTTPClient_send_message(self, channel_id, content, **kwds)
+    return await HTTPClient_send_message(self, channel_id, content, **kwds)
 
 
-def i18n_Adapter_create_interaction_response(self: AsyncWebhookAdapter, *args, **kwds):
+async def i18n_Adapter_create_interaction_response(
+    self: AsyncWebhookAdapter, *args, **kwds
+):
     """
     An override for `AsyncWebhookAdapter.create_interaction_response` whereby
     extracting language encoding if it exists and translates accordingly.
@@ -132,13 +137,15 @@ def i18n_Adapter_create_interaction_response(self: AsyncWebhookAdapter, *args, *
             (
                 kwds["data"],
                 kwds["data"][content_type],
-            ) = TranslationAgent.translate_payload(
+            ) = await TranslationAgent.translate_payload(
                 lang, kwds["data"], content, **AutoI18nAgent.get_config()
             )
-    return AsyncWebhookAdapter_create_interaction_response(self, *args, **kwds)
+    return await AsyncWebhookAdapter_create_interaction_response(self, *args, **kwds)
 
 
-def i18n_AsyncWebhookAdapter_execute_webhook(self: AsyncWebhookAdapter, *args, **kwds):
+async def i18n_AsyncWebhookAdapter_execute_webhook(
+    self: AsyncWebhookAdapter, *args, **kwds
+):
     if "payload" in kwds and kwds["payload"]:
         if "content" in kwds["payload"] and kwds["payload"]["content"].strip():
             content, lang = TranslationAgent.decode_lang_str(kwds["payload"]["content"])
@@ -146,10 +153,10 @@ def i18n_AsyncWebhookAdapter_execute_webhook(self: AsyncWebhookAdapter, *args, *
                 (
                     kwds["payload"],
                     kwds["payload"]["content"],
-                ) = TranslationAgent.translate_payload(
+                ) = await TranslationAgent.translate_payload(
                     lang, kwds["payload"], content, **AutoI18nAgent.get_config()
                 )
-    return AsyncWebhookAdapter_execute_webhook(self, *args, **kwds)
+    return await AsyncWebhookAdapter_execute_webhook(self, *args, **kwds)
 
 
 async def i18n_InteractionResponse_send_modal(self: InteractionResponse, modal: Modal):
@@ -157,8 +164,8 @@ async def i18n_InteractionResponse_send_modal(self: InteractionResponse, modal:
     Language code is appended to the modal title if there is a language
     preference.
 
-    TODO: Very problematic if translation functions are slow, often ends up
-    timing out on responses.
+    Slow translations can time out the response, set a `latency_budget` on
+    `AutoI18nAgent` to bound the time spent translating.
     """
     dest_lang = await AutoI18nAgent.detector.first_language_of(self)
     if dest_lang:
@@ -326,11 +333,12 @@ class AutoI18nAgent:
     translate_selects = False
     translate_modals = False
     source_lang = Language.English
+    latency_budget: Optional[float] = None
     _instantiated = False
 
     def __init__(
         self,
-        translator: Optional[Translator] = None,
+        translator: Optional[Union[Translator, AsyncTranslator]] = None,
         detector: Optional[Detector] = None,
         translate_all: Optional[bool] = None,
         translate_messages: Optional[bool] = None,
@@ -340,6 +348,9 @@ class AutoI18nAgent:
         translate_modals: Optional[bool] = None,
         source_lang: Optional[Language] = None,
         handle_webhooks: bool = True,
+        cache: Optional[Cache] = None,
+        latency_budget: Optional[float] = None,
+        catalog: Optional[CatalogTranslator] = None,
     ):
         """
         Sets initialized injectors to override high and low level.
@@ -348,6 +359,9 @@ class AutoI18nAgent:
 
         Parameters
         ----------
+        translator: Translator | AsyncTranslator
+            Backend used for translations. Blocking translators are run in a
+            thread pool so that they never stall the event loop
         translate_{x}: bool
             Flag for translating x interface, defaults to `True` for
             `translate_messages` and `False` for everything else
@@ -357,6 +371,17 @@ class AutoI18nAgent:
         handle_webhooks: bool
             enable webhook translations (not a static property and
             is only settable through this parameter)
+        cache: Cache
+            Cache backend shared by every translation, e.g. a `SqliteCache`
+            to keep translations on disk instead of in memory
+        latency_budget: float
+            Seconds a payload may spend being translated, e.g. `2.0` to answer
+            interactions within their 3 second deadline. Whatever is not
+            translated by then is sent as cached or in the source language and
+            keeps being translated in the background for next time
+        catalog: CatalogTranslator
+            gettext catalogs of professional translations that are used
+            before the cache and the translator
         """
         if AutoI18nAgent._instantiated:
             raise TypeError("this class should only be instantiated once")
@@ -391,6 +416,10 @@ class AutoI18nAgent:
         setattr(WebhookMessage, "edit", wrap_i18n_editer(WebhookMessage_edit))
         setattr(HTTPClient, "edit_message", i18n_HTTPClient_edit_message)
         setattr(InteractionResponse, "send_modal", i18n_InteractionResponse_send_modal)
+        if cache is not None:
+            TranslationAgent.cache = cache
+        if catalog is not None:
+            TranslationAgent.catalog = catalog
 
         for key, val in {
             "translator": translator,
@@ -401,12 +430,30 @@ class AutoI18nAgent:
             "translate_selects": translate_selects,
             "translate_modals": translate_modals,
             "source_lang": source_lang,
+            "latency_budget": latency_budget,
         }.items():
             if translate_all and key.startswith("translate_"):
                 setattr(AutoI18nAgent, key, True)
             elif val is not None:
                 setattr(AutoI18nAgent, key, val)
 
+    async def start(self):
+        """
+        Opens the connections of the translator and loads the cache ahead of
+        the first translation, e.g. in `on_connect`. A cache that is already
+        loaded is left as it is.
+        """
+        await AsyncTranslator.wrap(AutoI18nAgent.translator).start()
+        TranslationAgent.cache.load_cache_sync()
+
+    async def close(self):
+        """
+        Closes the connections of the translator and flushes the cache, e.g.
+        before the bot is closed.
+        """
+        await AsyncTranslator.wrap(AutoI18nAgent.translator).close()
+        await TranslationAgent.cache.close()
+
     @staticmethod
     def get_config():
         """
@@ -415,6 +462,7 @@ class AutoI18nAgent:
         return {
             "source_lang": AutoI18nAgent.source_lang,
             "translator": AutoI18nAgent.translator,
+            "latency_budget": AutoI18nAgent.latency_budget,
             "translate_components": (
                 AutoI18nAgent.translate_buttons
                 or AutoI18nAgent.translate_selects
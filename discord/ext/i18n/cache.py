@@ -1,25 +1,301 @@
 import json
+import mmap
 import anyio
+import atexit
+import struct
 import asyncio
+import sqlite3
+import threading
 
-from os import path, curdir, mkdir
-from .language import Language
+from collections import OrderedDict
+from hashlib import blake2b
+from collections.abc import MutableMapping
+from itertools import islice
+from os import path, curdir, mkdir, makedirs, remove, replace
+from sys import intern
+from unicodedata import normalize
+from weakref import WeakSet
+from zlib import crc32
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple
+from .language import LANG_CODE2ORDINAL, Language
+
+# Entry key holding the checksum of a phrase stored under a hashed key
+CHECK_KEY = "#"
+
+# Caches still alive at exit, held weakly so that they can be collected
+LIVE_CACHES: "WeakSet[Cache]" = WeakSet()
+
+
+@atexit.register
+def flush_live_caches():
+    for cache in list(LIVE_CACHES):
+        cache.flush_sync()
+
+
+class CompactEntry(MutableMapping):
+    __slots__ = ("mask", "values")
+
+    def __init__(self, translations: Optional[Mapping[str, str]] = None) -> None:
+        """
+        The translations of a single phrase, stored as a tuple of slots
+        indexed through a bit mask of `Language` ordinals.
+
+        Slot `n` of the tuple belongs to the language with the `n`-th lowest
+        ordinal that has a translation, so a lookup is a mask test and a
+        population count instead of a hashed lookup in a per-phrase dict.
+        It still behaves like a `{lang_code: translation}` mapping.
+        """
+        self.mask = 0
+        self.values: Tuple[str, ...] = ()
+        if translations:
+            self.update(translations)
+
+    def slot(self, ordinal: int):
+        bit = 1 << ordinal
+        return bit, bin(self.mask & (bit - 1)).count("1")
+
+    def lookup(self, lang: Language) -> Optional[str]:
+        bit, i = self.slot(lang.ordinal)
+        if self.mask & bit:
+            return self.values[i]
+        return None
+
+    def __getitem__(self, lang_code: str):
+        bit, i = self.slot(LANG_CODE2ORDINAL[lang_code])
+        if not self.mask & bit:
+            raise KeyError(lang_code)
+        return self.values[i]
+
+    def __setitem__(self, lang_code: str, translated: str):
+        bit, i = self.slot(LANG_CODE2ORDINAL[lang_code])
+        if self.mask & bit:
+            self.values = self.values[:i] + (translated,) + self.values[i + 1:]
+        else:
+            self.mask |= bit
+            self.values = self.values[:i] + (translated,) + self.values[i:]
+
+    def __delitem__(self, lang_code: str):
+        bit, i = self.slot(LANG_CODE2ORDINAL[lang_code])
+        if not self.mask & bit:
+            raise KeyError(lang_code)
+        self.mask &= ~bit
+        self.values = self.values[:i] + self.values[i + 1:]
+
+    def __contains__(self, lang_code: object):
+        ordinal = LANG_CODE2ORDINAL.get(lang_code)  # type: ignore
+        return ordinal is not None and bool(self.mask & (1 << ordinal))
+
+    def __iter__(self):
+        codes = list(LANG_CODE2ORDINAL)
+        mask, ordinal = self.mask, 0
+        while mask:
+            if mask & 1:
+                yield codes[ordinal]
+            mask >>= 1
+            ordinal += 1
+
+    def __len__(self):
+        return len(self.values)
+
+    def __repr__(self):
+        return f"CompactEntry({dict(self)!r})"
 
 
 class Cache:
-    def __init__(self, dir="__lang_cache__", filename="cache.json") -> None:
+    def __init__(
+        self,
+        dir="__lang_cache__",
+        filename="cache.json",
+        journal_filename="cache.journal",
+        compact_threshold: int = 10000,
+        flush_interval: float = 5.0,
+        flush_threshold: int = 64,
+        max_entries: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+        policy: str = "lru",
+        compact_entries: bool = False,
+        hash_keys: bool = False,
+        digest_size: int = 8,
+        verify_keys: bool = False,
+    ) -> None:
+        """
+        A translation cache persisted as a JSON snapshot plus an append-only
+        journal.
+
+        New entries are appended to the journal one line at a time, so a
+        write costs the size of the entry and not the size of the cache.
+        Once the journal holds `compact_threshold` entries it is folded back
+        into the snapshot. Loading replays the snapshot and then the journal.
+
+        Entries are not written as they are set. They are marked dirty and a
+        single background flusher writes them out at most once every
+        `flush_interval` seconds, or as soon as `flush_threshold` entries are
+        dirty. Remaining entries are flushed by `close` or at interpreter
+        exit.
+
+        Parameters
+        ----------
+        max_entries: int
+            Maximum amount of source phrases kept, unbounded by default
+        max_bytes: int
+            Approximate budget for the characters held by phrases and their
+            translations, unbounded by default
+        policy: str
+            Either "lru" to evict the least recently used phrase or "lfu" to
+            evict the least frequently used out of a sample of the oldest
+            phrases. Evicted phrases are dropped from the persisted cache too
+        compact_entries: bool
+            Intern source phrases and hold their translations in
+            `CompactEntry` objects instead of dicts, which cuts the memory
+            spent per phrase for large caches
+        hash_keys: bool
+            Key the cache on a `digest_size` bytes blake2b digest of the NFC
+            normalized phrase instead of the phrase itself, so the index
+            grows with the amount of entries and not with the length of the
+            text. A cache file written with hashed keys should only be loaded
+            with hashed keys of the same size
+        verify_keys: bool
+            Store a CRC32 of the phrase next to its hashed translations and
+            treat a mismatch as a miss, guarding against digest collisions
+        """
         self.cache_dir = path.join(curdir, dir)
         self.cache_fn = filename
         self.cache_pth = path.join(self.cache_dir, self.cache_fn)
+        self.journal_pth = path.join(self.cache_dir, journal_filename)
+        self.compact_threshold = compact_threshold
+        self.journal_size = 0
         self.sync_loaded = False
+        self.flush_interval = flush_interval
+        self.flush_threshold = flush_threshold
+        self.dirty: List[Tuple[str, Optional[str], Optional[str]]] = []
+        self.flusher: Optional[asyncio.Task] = None
+        self.wakeup: Optional[asyncio.Event] = None
+        self.lock: Optional[asyncio.Lock] = None
+        if policy not in ("lru", "lfu"):
+            raise ValueError(f"Unknown eviction policy {policy!r}")
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.policy = policy
+        self.bounded = bool(max_entries or max_bytes)
+        self.size = 0
+        self.evictions = 0
+        self.frequencies: Dict[str, int] = {}
+        self.compact_entries = compact_entries
+        if verify_keys and (compact_entries or not hash_keys):
+            raise ValueError("verify_keys requires hash_keys without compact_entries")
+        self.hash_keys = hash_keys
+        self.digest_size = digest_size
+        self.verify_keys = verify_keys
+        LIVE_CACHES.add(self)
+
+    @staticmethod
+    def encode_entry(src: str, lang_code: Optional[str], translated: Optional[str]):
+        """
+        Encodes a journal line, an entry without a language is a tombstone
+        for an evicted phrase.
+        """
+        return json.dumps([src, lang_code, translated], ensure_ascii=False) + "\n"
+
+    def add_entry(self, src: str, lang_code: str, translated: str):
+        if self.compact_entries:
+            entry = CompactEntry()
+            entry[lang_code] = translated
+            self.internal_cache[intern(src)] = entry
+        else:
+            self.internal_cache[src] = {lang_code: translated}
+
+    def weigh(self, src: str):
+        entry = self.internal_cache.get(src)
+        if entry is None:
+            return 0
+        return len(src) + sum(len(code) + len(tr) for code, tr in entry.items())
+
+    def victim(self):
+        if self.policy == "lru":
+            return next(iter(self.internal_cache))
+        # Sampled LFU: the least used out of the oldest few phrases
+        return min(
+            islice(self.internal_cache, 16),
+            key=lambda src: self.frequencies.get(src, 0),
+        )
+
+    def drop(self, src: str):
+        """
+        Removes a phrase from memory and marks its removal dirty.
+        """
+        if self.bounded:
+            self.size -= self.weigh(src)
+        del self.internal_cache[src]
+        self.frequencies.pop(src, None)
+        self.dirty.append((src, None, None))
+
+    def evict(self):
+        """
+        Evicts phrases until the cache is within its bounds again.
+        """
+        while self.internal_cache and (
+            (self.max_entries and len(self.internal_cache) > self.max_entries)
+            or (self.max_bytes and self.size > self.max_bytes)
+        ):
+            self.drop(self.victim())
+            self.evictions += 1
+
+    def key_of(self, src: str) -> Tuple[str, Optional[str]]:
+        """
+        Returns the key a phrase is stored under and, when keys are verified,
+        the checksum stored alongside it.
+        """
+        if not self.hash_keys:
+            return src, None
+        data = normalize("NFC", src).encode("utf-8")
+        key = blake2b(data, digest_size=self.digest_size).hexdigest()
+        return key, format(crc32(data), "08x") if self.verify_keys else None
+
+    def replay(self, snapshot: str, journal: str):
+        """
+        Rebuilds the internal cache from a snapshot followed by the entries
+        of a journal. A torn trailing journal line is skipped.
+        """
+        self.internal_cache = json.loads(snapshot) if snapshot.strip() else {}
+        if self.compact_entries:
+            self.internal_cache = {
+                intern(src): CompactEntry(translations)
+                for src, translations in self.internal_cache.items()
+            }
+        self.journal_size = 0
+        for line in journal.splitlines():
+            try:
+                src, lang_code, translated = json.loads(line)
+            except ValueError:
+                continue
+            if lang_code is None:
+                self.internal_cache.pop(src, None)
+            elif src in self.internal_cache:
+                self.internal_cache[src][lang_code] = translated
+            else:
+                self.add_entry(src, lang_code, translated)
+            self.journal_size += 1
+        if self.bounded:
+            self.size = sum(map(self.weigh, self.internal_cache))
+            self.evict()
 
     async def load_cache(self):
-        if not path.isfile(self.cache_pth):
+        self.sync_loaded = True
+        if not path.isfile(self.cache_pth) and not path.isfile(self.journal_pth):
             await self.empty()
         else:
-            f = await anyio.open_file(self.cache_pth, mode="r", encoding="utf-8")
-            self.internal_cache = json.loads(await f.read())
-            await f.aclose()
+            # Entries are only journaled until the first compaction writes
+            # the snapshot
+            snapshot = journal = ""
+            if path.isfile(self.cache_pth):
+                f = await anyio.open_file(self.cache_pth, mode="r", encoding="utf-8")
+                snapshot = await f.read()
+                await f.aclose()
+            if path.isfile(self.journal_pth):
+                f = await anyio.open_file(self.journal_pth, mode="r", encoding="utf-8")
+                journal = await f.read()
+                await f.aclose()
+            self.replay(snapshot, journal)
 
     def load_cache_sync(self):
         """
@@ -37,33 +313,594 @@ class Cache:
                 else:
                     open(self.cache_pth, mode=("w"), encoding="utf-8").close()
             else:
-                with open(self.cache_pth, mode="r", encoding="utf-8") as f:
-                    self.internal_cache = json.load(f)
+                snapshot = journal = ""
+                if path.isfile(self.cache_pth):
+                    with open(self.cache_pth, mode="r", encoding="utf-8") as f:
+                        snapshot = f.read()
+                if path.isfile(self.journal_pth):
+                    with open(self.journal_pth, mode="r", encoding="utf-8") as f:
+                        journal = f.read()
+                self.replay(snapshot, journal)
+
+    def get_lock(self):
+        # Created lazily so that the lock binds to the running event loop
+        if self.lock is None:
+            self.lock = asyncio.Lock()
+        return self.lock
+
+    async def append_journal(
+        self, entries: Iterable[Tuple[str, Optional[str], Optional[str]]]
+    ):
+        """
+        Appends entries to the journal and compacts it once it grows past the
+        compaction threshold.
+        """
+        lines = "".join(self.encode_entry(*entry) for entry in entries)
+        if not lines:
+            return
+        async with self.get_lock():
+            f = await anyio.open_file(self.journal_pth, mode="a", encoding="utf-8")
+            await f.write(lines)
+            await f.aclose()
+            self.journal_size += lines.count("\n")
+        if self.journal_size >= self.compact_threshold:
+            await self.compact()
+
+    async def compact(self):
+        """
+        Folds the journal into the snapshot and truncates the journal.
+
+        The in-memory cache is always ahead of the journal, so writing it out
+        as the snapshot already accounts for every journaled entry.
+        """
+        async with self.get_lock():
+            tmp_pth = f"{self.cache_pth}.tmp"
+            f = await anyio.open_file(tmp_pth, mode="w", encoding="utf-8")
+            await f.write(json.dumps(self.internal_cache, default=dict))
+            await f.aclose()
+            replace(tmp_pth, self.cache_pth)
+            f = await anyio.open_file(self.journal_pth, mode="w", encoding="utf-8")
+            await f.aclose()
+            self.journal_size = 0
 
     async def save_cache(self):
-        f = await anyio.open_file(self.cache_pth, mode="w", encoding="utf-8")
-        await f.write(json.dumps(self.internal_cache))
-        await f.aclose()
+        await self.flush()
+        await self.compact()
+
+    async def flush(self):
+        """
+        Writes every dirty entry to the journal in a single append.
+        """
+        if not self.dirty:
+            return
+        entries, self.dirty = self.dirty, []
+        await self.append_journal(entries)
+
+    def flush_sync(self):
+        """
+        Writes every dirty entry to the journal without an event loop.
+        """
+        entries, self.dirty = self.dirty, []
+        if entries and path.isdir(self.cache_dir):
+            with open(self.journal_pth, mode="a", encoding="utf-8") as f:
+                f.write("".join(self.encode_entry(*entry) for entry in entries))
+            self.journal_size += len(entries)
+
+    async def run_flusher(self):
+        """
+        Flushes dirty entries until there are none left, waiting up to
+        `flush_interval` between writes unless woken up early.
+        """
+        wakeup: asyncio.Event = self.wakeup  # type: ignore
+        while self.dirty:
+            if len(self.dirty) < self.flush_threshold:
+                try:
+                    await asyncio.wait_for(wakeup.wait(), self.flush_interval)
+                except asyncio.TimeoutError:
+                    pass
+            wakeup.clear()
+            await self.flush()
+
+    def schedule_flush(self):
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            # Without a running loop dirty entries wait for `flush_sync`
+            return
+        if self.flusher is None or self.flusher.done():
+            self.wakeup = asyncio.Event()
+            self.flusher = self.task(self.run_flusher())
+        elif len(self.dirty) >= self.flush_threshold and self.wakeup:
+            self.wakeup.set()
+
+    async def close(self):
+        """
+        Wakes the flusher up for a final write and waits for it to finish.
+        """
+        if self.flusher and not self.flusher.done():
+            if self.wakeup:
+                self.wakeup.set()
+            await self.flusher
+        await self.flush()
 
     async def empty(self):
         """
         Empty the internal and external cache.
         """
+        makedirs(self.cache_dir, exist_ok=True)
         f = await anyio.open_file(self.cache_pth, mode="w", encoding="utf-8")
         await f.write("{}")
         await f.aclose()
-        self.internal_cache = {}
+        f = await anyio.open_file(self.journal_pth, mode="w", encoding="utf-8")
+        await f.aclose()
+        self.internal_cache: Dict[str, Dict[str, Any]] = {}
+        self.journal_size = 0
+        self.dirty = []
+        self.frequencies = {}
+        self.size = 0
 
     def task(self, coro):
-        asyncio.create_task(coro)
+        return asyncio.create_task(coro)
 
     def set_cache(self, src: str, lang: Language, translated: str):
-        if src in self.internal_cache:
-            self.internal_cache[src][lang.code] = translated
+        src, check = self.key_of(src)
+        entry = self.internal_cache.get(src)
+        if check and entry is not None and entry.get(CHECK_KEY) != check:
+            # A different phrase collided with this digest, it gets replaced
+            self.drop(src)
+            entry = None
+        if self.bounded:
+            self.size -= self.weigh(src)
+            if self.policy == "lru" and entry is not None:
+                # Re-inserting moves the phrase to the most recent end
+                self.internal_cache[src] = self.internal_cache.pop(src)
+        if entry is not None:
+            entry[lang.code] = translated
+        else:
+            self.add_entry(src, lang.code, translated)
+            if check:
+                self.internal_cache[src][CHECK_KEY] = check
+                self.dirty.append((src, CHECK_KEY, check))
+        self.dirty.append((src, lang.code, translated))
+        if self.bounded:
+            self.size += self.weigh(src)
+            self.evict()
+        self.schedule_flush()
+
+    def get_many(self, srcs: Iterable[str], lang: Language) -> List[Optional[str]]:
+        """
+        Looks up several phrases at once, backends that pay per round trip
+        override this to batch the lookups.
+        """
+        return [self.get_cache(src, lang) for src in srcs]
+
+    def get_cache(self, src: str, lang: Language):
+        src, check = self.key_of(src)
+        entry = self.internal_cache.get(src)
+        if entry is None or (check and entry.get(CHECK_KEY) != check):
+            return None
+        if self.compact_entries:
+            translated = entry.lookup(lang)
         else:
-            self.internal_cache[src] = {lang.code: translated}
-        self.task(self.save_cache())
+            translated = entry.get(lang.code)
+        if translated is not None and self.bounded:
+            if self.policy == "lru":
+                self.internal_cache[src] = self.internal_cache.pop(src)
+            else:
+                self.frequencies[src] = self.frequencies.get(src, 0) + 1
+        return translated
+
+
+class MessageCache:
+    def __init__(self, max_entries: int = 2048) -> None:
+        """
+        An in-memory LRU cache of whole translated strings keyed on
+        (content, source language, destination language).
+
+        It sits above the phrase cache so that repeated messages are returned
+        as they were assembled, without tokenizing them again.
+
+        It also remembers whether if strings are in a destination language,
+        keyed on (content hash, destination language). Translations are known
+        to be in their destination language and their sources not to be, so
+        that sending either skips language identification.
+        """
+        self.max_entries = max_entries
+        self.entries: "OrderedDict[Tuple[str, str, str], str]" = OrderedDict()
+        self.decisions: "OrderedDict[Tuple[int, str], bool]" = OrderedDict()
+
+    def get(self, content: str, src_lang: Language, dest_lang: Language):
+        key = (content, src_lang.code, dest_lang.code)
+        translated = self.entries.get(key)
+        if translated is not None:
+            self.entries.move_to_end(key)
+        return translated
+
+    def set(
+        self, content: str, src_lang: Language, dest_lang: Language, translated: str
+    ):
+        self.entries[(content, src_lang.code, dest_lang.code)] = translated
+        if len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+        if translated != content:
+            self.decide(content, dest_lang, False)
+            self.decide(translated, dest_lang, True)
+
+    def same_language(self, content: str, dest_lang: Language) -> Optional[bool]:
+        """
+        Returns whether if the content is known to be in the destination
+        language, `None` if it is not known.
+        """
+        key = (hash(content), dest_lang.code)
+        same = self.decisions.get(key)
+        if same is not None:
+            self.decisions.move_to_end(key)
+        return same
+
+    def decide(self, content: str, dest_lang: Language, same: bool):
+        self.decisions[(hash(content), dest_lang.code)] = same
+        if len(self.decisions) > self.max_entries:
+            self.decisions.popitem(last=False)
+
+    def clear(self):
+        self.entries.clear()
+        self.decisions.clear()
+
+
+class SqliteCache(Cache):
+    def __init__(
+        self,
+        dir="__lang_cache__",
+        filename="cache.sqlite3",
+        hot_size: int = 1024,
+        flush_interval: float = 5.0,
+        flush_threshold: int = 64,
+    ) -> None:
+        """
+        A translation cache stored in an SQLite database indexed on
+        (phrase, lang_code), so only the entries that are looked up are ever
+        held in memory.
+
+        Lookups go through a small LRU hot layer of `hot_size` entries before
+        reaching the database. Writes are batched by the flusher and inserted
+        in a single transaction, entries waiting on it are served from memory.
+        The database runs in WAL mode so that the flusher can write from a
+        worker thread while lookups keep reading.
+        """
+        super().__init__(
+            dir,
+            filename,
+            flush_interval=flush_interval,
+            flush_threshold=flush_threshold,
+        )
+        self.hot_size = hot_size
+        self.hot: "OrderedDict[Tuple[str, str], str]" = OrderedDict()
+        # Entries set since the last flush, which may be evicted from `hot`
+        # before they reach the database
+        self.pending: Dict[Tuple[str, str], str] = {}
+        self.reader: Optional[sqlite3.Connection] = None
+        self.writer: Optional[sqlite3.Connection] = None
+        self.write_lock = threading.Lock()
+
+    def connect(self):
+        connection = sqlite3.connect(self.cache_pth, check_same_thread=False)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        return connection
+
+    def load_cache_sync(self):
+        if not self.sync_loaded:
+            self.sync_loaded = True
+            makedirs(self.cache_dir, exist_ok=True)
+            self.writer = self.connect()
+            with self.writer:
+                self.writer.execute(
+                    "CREATE TABLE IF NOT EXISTS translations ("
+                    "phrase TEXT NOT NULL, "
+                    "lang_code TEXT NOT NULL, "
+                    "translated TEXT NOT NULL, "
+                    "PRIMARY KEY (phrase, lang_code)"
+                    ") WITHOUT ROWID"
+                )
+            self.reader = self.connect()
+
+    async def load_cache(self):
+        self.load_cache_sync()
+
+    def write_entries(self, entries: List[Tuple[str, str, str]]):
+        with self.write_lock, self.writer:  # type: ignore
+            self.writer.executemany(  # type: ignore
+                "INSERT OR REPLACE INTO translations VALUES (?, ?, ?)", entries
+            )
+        for src, lang_code, translated in entries:
+            # Unless it was set again in the meantime
+            if self.pending.get((src, lang_code)) == translated:
+                del self.pending[(src, lang_code)]
+
+    async def append_journal(
+        self, entries: Iterable[Tuple[str, Optional[str], Optional[str]]]
+    ):
+        entries = list(entries)
+        if entries:
+            await anyio.to_thread.run_sync(self.write_entries, entries)
+
+    async def compact(self):
+        """
+        Checkpoints the write-ahead log into the database file.
+        """
+        with self.write_lock:
+            self.writer.execute("PRAGMA wal_checkpoint(TRUNCATE)")  # type: ignore
+
+    def flush_sync(self):
+        entries, self.dirty = self.dirty, []
+        if entries and self.writer:
+            self.write_entries(entries)
+
+    async def empty(self):
+        self.load_cache_sync()
+        with self.write_lock, self.writer:  # type: ignore
+            self.writer.execute("DELETE FROM translations")  # type: ignore
+        self.hot.clear()
+        self.pending.clear()
+        self.dirty = []
+
+    def remember(self, key: Tuple[str, str], translated: str):
+        self.hot[key] = translated
+        self.hot.move_to_end(key)
+        if len(self.hot) > self.hot_size:
+            self.hot.popitem(last=False)
+
+    def set_cache(self, src: str, lang: Language, translated: str):
+        self.remember((src, lang.code), translated)
+        self.pending[(src, lang.code)] = translated
+        self.dirty.append((src, lang.code, translated))
+        self.schedule_flush()
+
+    def get_cache(self, src: str, lang: Language):
+        key = (src, lang.code)
+        if key in self.hot:
+            self.hot.move_to_end(key)
+            return self.hot[key]
+        if key in self.pending:
+            return self.pending[key]
+        if self.reader is None:
+            return None
+        row = self.reader.execute(
+            "SELECT translated FROM translations WHERE phrase = ? AND lang_code = ?",
+            key,
+        ).fetchone()
+        if row:
+            self.remember(key, row[0])
+            return row[0]
+
+
+class ShardedCache(Cache):
+    def __init__(self, dir="__lang_cache__", **options: Any) -> None:
+        """
+        A translation cache sharded by destination language into one file per
+        language, e.g. `__lang_cache__/es.json`.
+
+        A shard is only loaded the first time a translation into its language
+        is looked up or set, and every shard flushes on its own, so memory
+        and startup scale with the languages actually in use. Extra options
+        are passed to the `Cache` of each shard.
+        """
+        super().__init__(dir)
+        self.dir = dir
+        self.options = options
+        self.shards: Dict[str, Cache] = {}
+
+    def shard(self, lang: Language) -> Cache:
+        shard = self.shards.get(lang.code)
+        if shard is None:
+            shard = self.shards[lang.code] = Cache(
+                self.dir,
+                filename=f"{lang.code}.json",
+                journal_filename=f"{lang.code}.journal",
+                **self.options,
+            )
+            shard.load_cache_sync()
+        return shard
+
+    def load_cache_sync(self):
+        if not self.sync_loaded:
+            self.sync_loaded = True
+            makedirs(self.cache_dir, exist_ok=True)
+
+    async def load_cache(self):
+        self.load_cache_sync()
+
+    async def save_cache(self):
+        for shard in list(self.shards.values()):
+            await shard.save_cache()
+
+    async def flush(self):
+        for shard in list(self.shards.values()):
+            await shard.flush()
+
+    def flush_sync(self):
+        pass
+
+    async def close(self):
+        for shard in list(self.shards.values()):
+            await shard.close()
+
+    async def empty(self):
+        self.load_cache_sync()
+        for lang in Language:
+            if lang.code in self.shards or any(
+                path.isfile(path.join(self.cache_dir, f"{lang.code}.{ext}"))
+                for ext in ("json", "journal")
+            ):
+                await self.shard(lang).empty()
+
+    def set_cache(self, src: str, lang: Language, translated: str):
+        self.shard(lang).set_cache(src, lang, translated)
+
+    def get_cache(self, src: str, lang: Language):
+        return self.shard(lang).get_cache(src, lang)
+
+
+SNAPSHOT_MAGIC = b"I18C"
+SNAPSHOT_HEADER = struct.Struct("<4sI")
+SNAPSHOT_RECORD = struct.Struct("<QIQI")
+
+
+def compile_cache(entries: Mapping[str, Mapping[str, str]], pth: str):
+    """
+    Compiles a `{phrase: {lang_code: translation}}` mapping into a binary
+    snapshot that `CompiledCache` can look up without deserializing it.
+
+    The snapshot is a header, a table of fixed-width records sorted by key
+    and a blob holding every key and translation as UTF-8. Keys are the
+    language code and the phrase joined by a null byte.
+    """
+    pairs = sorted(
+        (f"{code}\0{src}".encode("utf-8"), translated.encode("utf-8"))
+        for src, translations in entries.items()
+        for code, translated in translations.items()
+    )
+    offset = SNAPSHOT_HEADER.size + SNAPSHOT_RECORD.size * len(pairs)
+    records, blobs = [], []
+    for key, value in pairs:
+        records.append(
+            SNAPSHOT_RECORD.pack(offset, len(key), offset + len(key), len(value))
+        )
+        blobs.append(key)
+        blobs.append(value)
+        offset += len(key) + len(value)
+
+    tmp_pth = f"{pth}.tmp"
+    with open(tmp_pth, mode="wb") as f:
+        f.write(SNAPSHOT_HEADER.pack(SNAPSHOT_MAGIC, len(pairs)))
+        f.write(b"".join(records))
+        f.write(b"".join(blobs))
+    replace(tmp_pth, pth)
+
+
+class CompiledCache(Cache):
+    def __init__(
+        self,
+        dir="__lang_cache__",
+        filename="cache.bin",
+        overlay: Optional[Cache] = None,
+    ) -> None:
+        """
+        A read-only snapshot compiled by `compile_cache`, memory mapped and
+        binary searched in place so that startup does not parse the cache.
+
+        New translations go into `overlay`, a regular mutable cache that is
+        consulted first. `recompile` folds the overlay back into the
+        snapshot.
+        """
+        super().__init__(dir, filename)
+        self.overlay = overlay or Cache(
+            dir, filename="overlay.json", journal_filename="overlay.journal"
+        )
+        self.snapshot: Optional[mmap.mmap] = None
+        self.count = 0
+
+    def open_snapshot(self):
+        self.close_snapshot()
+        if path.isfile(self.cache_pth):
+            with open(self.cache_pth, mode="rb") as f:
+                self.snapshot = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            magic, self.count = SNAPSHOT_HEADER.unpack_from(self.snapshot)
+            if magic != SNAPSHOT_MAGIC:
+                self.close_snapshot()
+                raise ValueError(f"{self.cache_pth} is not a compiled cache")
+
+    def close_snapshot(self):
+        if self.snapshot is not None:
+            self.snapshot.close()
+            self.snapshot = None
+            self.count = 0
+
+    def lookup(self, key: bytes) -> Optional[str]:
+        """
+        Binary searches the snapshot records for a key.
+        """
+        snapshot = self.snapshot
+        if snapshot is None:
+            return None
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            key_off, key_len, val_off, val_len = SNAPSHOT_RECORD.unpack_from(
+                snapshot, SNAPSHOT_HEADER.size + mid * SNAPSHOT_RECORD.size
+            )
+            probe = snapshot[key_off: key_off + key_len]
+            if probe < key:
+                lo = mid + 1
+            elif probe > key:
+                hi = mid
+            else:
+                return snapshot[val_off: val_off + val_len].decode("utf-8")
+        return None
+
+    def items(self):
+        """
+        Yields every `(phrase, lang_code, translation)` in the snapshot.
+        """
+        snapshot = self.snapshot
+        if snapshot is None:
+            return
+        for i in range(self.count):
+            key_off, key_len, val_off, val_len = SNAPSHOT_RECORD.unpack_from(
+                snapshot, SNAPSHOT_HEADER.size + i * SNAPSHOT_RECORD.size
+            )
+            key = snapshot[key_off: key_off + key_len].decode("utf-8")
+            code, src = key.split("\0", 1)
+            yield src, code, snapshot[val_off: val_off + val_len].decode("utf-8")
+
+    def load_cache_sync(self):
+        if not self.sync_loaded:
+            self.sync_loaded = True
+            self.overlay.load_cache_sync()
+            self.open_snapshot()
+
+    async def load_cache(self):
+        await self.overlay.load_cache()
+        self.open_snapshot()
+
+    async def recompile(self):
+        """
+        Compiles the snapshot together with the overlay into a new snapshot
+        and empties the overlay.
+        """
+        entries: Dict[str, Dict[str, str]] = {}
+        for src, code, translated in self.items():
+            entries.setdefault(src, {})[code] = translated
+        for src, translations in self.overlay.internal_cache.items():
+            entries.setdefault(src, {}).update(translations)
+        self.close_snapshot()
+        await anyio.to_thread.run_sync(compile_cache, entries, self.cache_pth)
+        await self.overlay.empty()
+        self.open_snapshot()
+
+    async def save_cache(self):
+        await self.overlay.save_cache()
+
+    async def flush(self):
+        await self.overlay.flush()
+
+    def flush_sync(self):
+        pass
+
+    async def close(self):
+        await self.overlay.close()
+
+    async def empty(self):
+        self.close_snapshot()
+        if path.isfile(self.cache_pth):
+            remove(self.cache_pth)
+        await self.overlay.empty()
+
+    def set_cache(self, src: str, lang: Language, translated: str):
+        self.overlay.set_cache(src, lang, translated)
 
     def get_cache(self, src: str, lang: Language):
-        if src in self.internal_cache and lang.code in self.internal_cache[src]:
-            return self.internal_cache[src][lang.code]
+        cached = self.overlay.get_cache(src, lang)
+        if cached is None:
+            cached = self.lookup(f"{lang.code}\0{src}".encode("utf-8"))
+        return cached
@@ -0,0 +1,435 @@
+from bisect import bisect_right
+from collections import Counter, OrderedDict
+from heapq import nlargest
+from itertools import islice
+from math import log
+from operator import add
+from typing import Dict, List, Optional, Tuple
+
+from .language import Language
+
+# Unicode blocks of the letters identified, as (first, last, script)
+SCRIPT_RANGES = [
+    (0x0041, 0x024F, "Latin"),
+    (0x0370, 0x03FF, "Greek"),
+    (0x0400, 0x052F, "Cyrillic"),
+    (0x0530, 0x058F, "Armenian"),
+    (0x0590, 0x05FF, "Hebrew"),
+    (0x0600, 0x06FF, "Arabic"),
+    (0x0750, 0x077F, "Arabic"),
+    (0x0900, 0x097F, "Devanagari"),
+    (0x0980, 0x09FF, "Bengali"),
+    (0x0A00, 0x0A7F, "Gurmukhi"),
+    (0x0A80, 0x0AFF, "Gujarati"),
+    (0x0B00, 0x0B7F, "Oriya"),
+    (0x0B80, 0x0BFF, "Tamil"),
+    (0x0C00, 0x0C7F, "Telugu"),
+    (0x0C80, 0x0CFF, "Kannada"),
+    (0x0D00, 0x0D7F, "Malayalam"),
+    (0x0D80, 0x0DFF, "Sinhala"),
+    (0x0E00, 0x0E7F, "Thai"),
+    (0x0E80, 0x0EFF, "Lao"),
+    (0x1000, 0x109F, "Myanmar"),
+    (0x10A0, 0x10FF, "Georgian"),
+    (0x1100, 0x11FF, "Hangul"),
+    (0x1200, 0x137F, "Ethiopic"),
+    (0x1780, 0x17FF, "Khmer"),
+    (0x1E00, 0x1EFF, "Latin"),
+    (0x3040, 0x309F, "Kana"),
+    (0x30A0, 0x30FF, "Kana"),
+    (0x3130, 0x318F, "Hangul"),
+    (0x3400, 0x4DBF, "Han"),
+    (0x4E00, 0x9FFF, "Han"),
+    (0xAC00, 0xD7AF, "Hangul"),
+    (0xF900, 0xFAFF, "Han"),
+]
+SCRIPT_STARTS = [first for first, _, _ in SCRIPT_RANGES]
+
+# Scripts written in a single language. Hebrew (Hebrew and Yiddish) and Han
+# without Kana (Simplified and Traditional Chinese) are shared by several
+# languages without a profile to tell them apart, so they are unidentified
+SCRIPT_LANGS = {
+    "Greek": Language.Greek,
+    "Armenian": Language.Armenian,
+    "Bengali": Language.Bengali,
+    "Gurmukhi": Language.Punjabi,
+    "Gujarati": Language.Gujarati,
+    "Oriya": Language.Odia,
+    "Tamil": Language.Tamil,
+    "Telugu": Language.Telugu,
+    "Kannada": Language.Kannada,
+    "Malayalam": Language.Malayalam,
+    "Sinhala": Language.Sinhala,
+    "Thai": Language.Thai,
+    "Lao": Language.Lao,
+    "Myanmar": Language.Myanmar,
+    "Georgian": Language.Georgian,
+    "Hangul": Language.Korean,
+    "Ethiopic": Language.Amharic,
+    "Khmer": Language.Khmer,
+    "Kana": Language.Japanese,
+}
+
+# Sample text of the languages sharing a script, the first article of the
+# Universal Declaration of Human Rights followed by frequent words
+SAMPLES: Dict[str, Dict[Language, str]] = {
+    "Latin": {
+        Language.English: (
+            "All human beings are born free and equal in dignity and rights. They "
+            "are endowed with reason and conscience and should act towards one "
+            "another in a spirit of brotherhood. the of and to in is you that it "
+            "was for on are with as his they be at have this from or had by but "
+            "what some we can out were there when your how said each she which do "
+            "their time if will about then them would like so these her make see"
+        ),
+        Language.French: (
+            "Tous les êtres humains naissent libres et égaux en dignité et en "
+            "droits. Ils sont doués de raison et de conscience et doivent agir "
+            "les uns envers les autres dans un esprit de fraternité. le la les "
+            "de des du un une et est pas que qui dans ce il elle nous vous avec "
+            "pour sur mais ou donc où être avoir fait plus tout bien très"
+        ),
+        Language.Spanish: (
+            "Todos los seres humanos nacen libres e iguales en dignidad y "
+            "derechos y, dotados como están de razón y conciencia, deben "
+            "comportarse fraternalmente los unos con los otros. el la los las de "
+            "del y que en un una es no por con para su al lo como más pero sus "
+            "le ya o este sí porque esta entre cuando muy sin sobre también"
+        ),
+        Language.German: (
+            "Alle Menschen sind frei und gleich an Würde und Rechten geboren. Sie "
+            "sind mit Vernunft und Gewissen begabt und sollen einander im Geist "
+            "der Brüderlichkeit begegnen. der die das und ist nicht ich du ein "
+            "eine zu den von mit sich auf für es auch dem wie noch aber wir ihr "
+            "hat wird nach bei aus wenn schon über"
+        ),
+        Language.Italian: (
+            "Tutti gli esseri umani nascono liberi ed eguali in dignità e "
+            "diritti. Essi sono dotati di ragione e di coscienza e devono agire "
+            "gli uni verso gli altri in spirito di fratellanza. il lo la gli le "
+            "di del della che è non per un una con sono questo anche come più ma "
+            "mi ti ci se perché quando molto tutto"
+        ),
+        Language.Portuguese: (
+            "Todos os seres humanos nascem livres e iguais em dignidade e em "
+            "direitos. Dotados de razão e de consciência, devem agir uns para com "
+            "os outros em espírito de fraternidade. o a os as de do da e que em "
+            "um uma não para com por mais como mas foi ao ele ela seu sua são "
+            "você também quando muito já está"
+        ),
+        Language.Dutch: (
+            "Alle mensen worden vrij en gelijk in waardigheid en rechten geboren. "
+            "Zij zijn begiftigd met verstand en geweten, en behoren zich jegens "
+            "elkander in een geest van broederschap te gedragen. de het een en "
+            "van ik te dat die niet is je er maar om wat op zijn ook als hij nog "
+            "wel naar kan geen dan"
+        ),
+        Language.Swedish: (
+            "Alla människor är födda fria och lika i värde och rättigheter. De "
+            "är utrustade med förnuft och samvete och bör handla gentemot "
+            "varandra i en anda av broderskap."
+        ),
+        Language.Danish: (
+            "Alle mennesker er født frie og lige i værdighed og rettigheder. De "
+            "er udstyret med fornuft og samvittighed, og de bør handle mod "
+            "hverandre i en broderskabets ånd."
+        ),
+        Language.Norwegian: (
+            "Alle mennesker er født frie og med samme menneskeverd og "
+            "menneskerettigheter. De er utstyrt med fornuft og samvittighet og "
+            "bør handle mot hverandre i brorskapets ånd."
+        ),
+        Language.Finnish: (
+            "Kaikki ihmiset syntyvät vapaina ja tasavertaisina arvoltaan ja "
+            "oikeuksiltaan. Heille on annettu järki ja omatunto, ja heidän on "
+            "toimittava toisiaan kohtaan veljeyden hengessä."
+        ),
+        Language.Estonian: (
+            "Kõik inimesed sünnivad vabadena ja võrdsetena oma väärikuselt ja "
+            "õigustelt. Neile on antud mõistus ja südametunnistus ja nende "
+            "suhtumist üksteisesse peab kandma vendluse vaim."
+        ),
+        Language.Polish: (
+            "Wszyscy ludzie rodzą się wolni i równi pod względem swej godności i "
+            "swych praw. Są oni obdarzeni rozumem i sumieniem i powinni "
+            "postępować wobec innych w duchu braterstwa."
+        ),
+        Language.Czech: (
+            "Všichni lidé rodí se svobodní a sobě rovní co do důstojnosti a "
+            "práv. Jsou nadáni rozumem a svědomím a mají spolu jednat v duchu "
+            "bratrství."
+        ),
+        Language.Slovak: (
+            "Všetci ľudia sa rodia slobodní a sebe rovní, čo sa týka ich "
+            "dôstojnosti a práv. Sú obdarení rozumom a svedomím a majú spolu "
+            "zaobchádzať v duchu bratstva."
+        ),
+        Language.Croatian: (
+            "Sva ljudska bića rađaju se slobodna i jednaka u dostojanstvu i "
+            "pravima. Ona su obdarena razumom i sviješću pa jedna prema drugima "
+            "trebaju postupati u duhu bratstva."
+        ),
+        Language.Hungarian: (
+            "Minden emberi lény szabadon születik és egyenlő méltósága és joga "
+            "van. Az emberek, ésszel és lelkiismerettel bírván, egymással szemben "
+            "testvéri szellemben kell hogy viseltessenek."
+        ),
+        Language.Romanian: (
+            "Toate ființele umane se nasc libere și egale în demnitate și în "
+            "drepturi. Ele sunt înzestrate cu rațiune și conștiință și trebuie "
+            "să se comporte unele față de altele în spiritul fraternității."
+        ),
+        Language.Lithuanian: (
+            "Visi žmonės gimsta laisvi ir lygūs savo orumu ir teisėmis. Jiems "
+            "suteiktas protas ir sąžinė ir jie turi elgtis vienas kito atžvilgiu "
+            "kaip broliai."
+        ),
+        Language.Latvian: (
+            "Visi cilvēki piedzimst brīvi un vienlīdzīgi savā pašcieņā un "
+            "tiesībās. Viņi ir apveltīti ar saprātu un sirdsapziņu, un viņiem "
+            "jāizturas citam pret citu brālības garā."
+        ),
+        Language.Catalan: (
+            "Tots els éssers humans neixen lliures i iguals en dignitat i en "
+            "drets. Són dotats de raó i de consciència, i han de comportar-se "
+            "fraternalment els uns amb els altres."
+        ),
+        Language.Turkish: (
+            "Bütün insanlar hür, haysiyet ve haklar bakımından eşit doğarlar. "
+            "Akıl ve vicdana sahiptirler ve birbirlerine karşı kardeşlik "
+            "zihniyeti ile hareket etmelidirler."
+        ),
+        Language.Indonesian: (
+            "Semua orang dilahirkan merdeka dan mempunyai martabat dan hak-hak "
+            "yang sama. Mereka dikaruniai akal dan hati nurani dan hendaknya "
+            "bergaul satu sama lain dalam semangat persaudaraan."
+        ),
+        Language.Malay: (
+            "Semua manusia dilahirkan bebas dan samarata dari segi kemuliaan dan "
+            "hak-hak. Mereka mempunyai pemikiran dan perasaan hati dan hendaklah "
+            "bertindak di antara satu sama lain dengan semangat persaudaraan."
+        ),
+        Language.Vietnamese: (
+            "Tất cả mọi người sinh ra đều được tự do và bình đẳng về nhân phẩm và "
+            "quyền lợi. Mọi con người đều được tạo hóa ban cho lý trí và lương "
+            "tâm và cần phải đối xử với nhau trong tình bằng hữu."
+        ),
+        Language.Filipino: (
+            "Ang lahat ng tao'y isinilang na malaya at pantay-pantay sa "
+            "karangalan at mga karapatan. Sila'y pinagkalooban ng katwiran at "
+            "budhi at dapat magpalagayan ang isa't isa sa diwa ng pagkakapatiran."
+        ),
+        Language.Swahili: (
+            "Watu wote wamezaliwa huru, hadhi na haki zao ni sawa. Wote wamejaliwa "
+            "akili na dhamiri, hivyo yapasa watendeane kindugu."
+        ),
+    },
+    "Cyrillic": {
+        Language.Russian: (
+            "Все люди рождаются свободными и равными в своем достоинстве и "
+            "правах. Они наделены разумом и совестью и должны поступать в "
+            "отношении друг друга в духе братства. и в не на я что он с это как "
+            "по но они к у же вы за бы так от все она мы"
+        ),
+        Language.Ukrainian: (
+            "Всі люди народжуються вільними і рівними у своїй гідності та "
+            "правах. Вони наділені розумом і совістю і повинні діяти у "
+            "відношенні один до одного в дусі братерства. і в не на я що він з "
+            "це як але вони до у ви за би так від все вона ми її"
+        ),
+        Language.Bulgarian: (
+            "Всички хора се раждат свободни и равни по достойнство и права. Те "
+            "са надарени с разум и съвест и следва да се отнасят помежду си в "
+            "дух на братство."
+        ),
+        Language.Serbian: (
+            "Сва људска бића рађају се слободна и једнака у достојанству и "
+            "правима. Она су обдарена разумом и свешћу и треба једни према "
+            "другима да поступају у духу братства."
+        ),
+    },
+    "Arabic": {
+        Language.Arabic: (
+            "يولد جميع الناس أحرارًا متساوين في الكرامة والحقوق. وقد وهبوا عقلاً "
+            "وضميرًا وعليهم أن يعامل بعضهم بعضًا بروح الإخاء."
+        ),
+        Language.Persian: (
+            "تمام افراد بشر آزاد به دنیا می‌آیند و از لحاظ حیثیت و حقوق با هم "
+            "برابرند. همه دارای عقل و وجدان هستند و باید نسبت به یکدیگر با روح "
+            "برادری رفتار کنند."
+        ),
+        Language.Urdu: (
+            "تمام انسان آزاد اور حقوق و عزت کے اعتبار سے برابر پیدا ہوئے ہیں۔ "
+            "انہیں ضمیر اور عقل ودیعت ہوئی ہے۔ اس لئے انہیں ایک دوسرے کے ساتھ "
+            "بھائی چارے کا سلوک کرنا چاہیئے۔"
+        ),
+    },
+    "Devanagari": {
+        Language.Hindi: (
+            "सभी मनुष्यों को गौरव और अधिकारों के मामले में जन्मजात स्वतन्त्रता और "
+            "समानता प्राप्त है। उन्हें बुद्धि और अन्तरात्मा की देन प्राप्त है और "
+            "परस्पर उन्हें भाईचारे के भाव से बर्ताव करना चाहिए।"
+        ),
+        Language.Marathi: (
+            "सर्व मानवी व्यक्ति जन्मतःच स्वतंत्र आहेत व त्यांना समान प्रतिष्ठा व "
+            "समान अधिकार आहेत. त्यांना विचारशक्ति व सदसद्विवेकबुद्धि लाभलेली आहे "
+            "व त्यांनी एकमेकांशी बंधुत्वाच्या भावनेने आचरण करावे."
+        ),
+    },
+}
+
+
+def script_of(char: str) -> Optional[str]:
+    """
+    Returns the script of a letter or `None` if it is not a letter of the
+    identified scripts.
+    """
+    code = ord(char)
+    i = bisect_right(SCRIPT_STARTS, code) - 1
+    if i >= 0 and code <= SCRIPT_RANGES[i][1] and char.isalpha():
+        return SCRIPT_RANGES[i][2]
+    return None
+
+
+def ngrams(text: str):
+    """
+    Yields the character n-grams of one to three characters of every word,
+    the words being padded with spaces.
+    """
+    for word in "".join(c if c.isalpha() else " " for c in text.lower()).split():
+        padded = f" {word} "
+        for n in (1, 2, 3):
+            for i in range(len(padded) - n + 1):
+                gram = padded[i : i + n]
+                if gram != " ":
+                    yield gram
+
+
+class LanguageIdentifier:
+    def __init__(
+        self,
+        samples: Dict[str, Dict[Language, str]] = SAMPLES,
+        min_grams: int = 12,
+        min_margin: float = 0.12,
+        max_entries: int = 4096,
+        max_chars: int = 256,
+        max_grams: int = 96,
+        decisive_margin: float = 0.5,
+    ) -> None:
+        """
+        Identifies the language of a text locally, without any network call.
+
+        Letters are classified by Unicode script first, which settles every
+        script written in a single language. Languages sharing a script are
+        told apart by a naive Bayes model over the character n-grams of
+        their `samples`.
+
+        Texts that are too short or too close between languages are not
+        identified, so that a text is never mistaken for a language. Results
+        are kept in a least recently used cache of `max_entries` texts.
+
+        Only the start of a text is looked at, so that identifying a long
+        message costs about as much as identifying a short one.
+
+        Parameters
+        ----------
+        min_grams: int
+            n-grams a text needs for its language to be told apart from the
+            others of its script
+        min_margin: float
+            Least difference of mean log probability per n-gram between the
+            two most likely languages
+        max_chars: int
+            Characters at the start of a text that its script is counted and
+            its n-grams are taken from
+        max_grams: int
+            n-grams scored at most
+        decisive_margin: float
+            Difference of mean log probability per n-gram between the two
+            most likely languages past which scoring stops early
+        """
+        self.min_grams = min_grams
+        self.min_margin = min_margin
+        self.max_chars = max_chars
+        self.max_grams = max_grams
+        self.decisive_margin = decisive_margin
+        self.max_entries = max_entries
+        self.entries: "OrderedDict[str, Optional[Language]]" = OrderedDict()
+        # The languages of each script, the log probabilities of every n-gram
+        # in each of them and those of an n-gram they have never seen
+        self.profiles: Dict[
+            str,
+            Tuple[List[Language], Dict[str, Tuple[float, ...]], Tuple[float, ...]],
+        ] = {}
+        for script, texts in samples.items():
+            counts = {lang: Counter(ngrams(text)) for lang, text in texts.items()}
+            vocabulary = set().union(*counts.values())
+            totals = [sum(c.values()) + len(vocabulary) for c in counts.values()]
+            self.profiles[script] = (
+                list(counts),
+                {
+                    gram: tuple(
+                        log((counter[gram] + 1) / total)
+                        for counter, total in zip(counts.values(), totals)
+                    )
+                    for gram in vocabulary
+                },
+                tuple(log(1 / total) for total in totals),
+            )
+
+    def identify(self, text: str) -> Optional[Language]:
+        """
+        Returns the language of a text or `None` if it cannot be told.
+        """
+        if text in self.entries:
+            self.entries.move_to_end(text)
+            return self.entries[text]
+        lang = self.classify(text)
+        self.entries[text] = lang
+        if len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+        return lang
+
+    def classify(self, text: str) -> Optional[Language]:
+        text = text[: self.max_chars]
+        scripts: "Counter[str]" = Counter()
+        for char, n in Counter(text).items():
+            script = script_of(char)
+            if script is not None:
+                scripts[script] += n
+        if not scripts:
+            return None
+        if "Kana" in scripts:
+            return Language.Japanese
+        script, _ = scripts.most_common(1)[0]
+        if script in SCRIPT_LANGS:
+            return SCRIPT_LANGS[script]
+        return self.compare(text, script)
+
+    def compare(self, text: str, script: str) -> Optional[Language]:
+        """
+        Returns the most likely language of the text among those written in
+        the script, if it is likely enough.
+
+        n-grams are scored in steps of `min_grams`, stopping as soon as the
+        two most likely languages are `decisive_margin` apart.
+        """
+        if script not in self.profiles:
+            return None
+        langs, table, unseen = self.profiles[script]
+        grams = list(islice(ngrams(text), self.max_grams))
+        if len(grams) < self.min_grams:
+            return None
+        totals = [0.0] * len(langs)
+        for start in range(0, len(grams), self.min_grams):
+            step = grams[start : start + self.min_grams]
+            # Columns of the step's log probabilities, one per language
+            sums = map(sum, zip(*(table.get(gram, unseen) for gram in step)))
+            totals = list(map(add, totals, sums))
+            top = nlargest(2, totals)
+            margin = (top[0] - top[-1]) / (start + len(step))
+            if len(top) < 2 or margin >= self.decisive_margin:
+                break
+        if len(top) > 1 and margin < self.min_margin:
+            return None
+        return langs[totals.index(top[0])]
@@ -745,6 +745,13 @@ class Language(Enum):
     def name(self) -> str:
         return LANG_CODE2NAME[self.value]
 
+    @property
+    def ordinal(self) -> int:
+        """
+        Position of the language in the enum, usable as an array index.
+        """
+        return LANG_CODE2ORDINAL[self.value]
+
     @staticmethod
     def from_code(lang_id: str) -> Optional["Language"]:
         return Language._value2member_map_.get(lang_id, None)  # type: ignore
@@ -752,3 +759,6 @@ class Language(Enum):
     @staticmethod
     def from_name(name: str):
         return Language.from_code(LANG_NAME2CODE[name])
+
+
+LANG_CODE2ORDINAL = {code: i for i, code in enumerate(Language._value2member_map_)}
@@ -1,15 +1,91 @@
+import asyncio
+import re
+
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 from traceback import print_exception
 from googletrans import Translator as GoogleTranslator
-from typing import Any, Dict, List, Optional
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    TYPE_CHECKING,
+    TypeVar,
+    Union,
+)
+from weakref import WeakKeyDictionary
 from enum import Enum
 from string import ascii_letters, punctuation, whitespace
 
-from .cache import Cache
+from .cache import Cache, MessageCache
+from .identify import LanguageIdentifier
 from .language import CODEBLOCK_LANGS, LANG_CODE2NAME, Language
 
+if TYPE_CHECKING:
+    from .translators import CatalogTranslator
+
 punctuation += f"{whitespace}\u200b"
 trailing_punctuation = punctuation.replace("?", "")
 
+T = TypeVar("T")
+
+
+class Token(NamedTuple):
+    start_pos: int
+    end_pos: int
+    phrase: str
+
+    def __getitem__(self, key: Any):  # type: ignore
+        # Tokens used to be dicts, they can still be indexed by field name
+        if isinstance(key, str):
+            return getattr(self, key)
+        return tuple.__getitem__(self, key)
+
+
+class Decoratives(dict):
+    """
+    A dict of opening to closing decoratives that counts its edits, so that
+    the tokenizer compiles them again only once they change.
+    """
+
+    version = 0
+
+    def __setitem__(self, key: str, value: str):
+        super().__setitem__(key, value)
+        self.version += 1
+
+    def __delitem__(self, key: str):
+        super().__delitem__(key)
+        self.version += 1
+
+    def clear(self):
+        super().clear()
+        self.version += 1
+
+    def pop(self, *args: Any):
+        self.version += 1
+        return super().pop(*args)
+
+    def popitem(self):
+        self.version += 1
+        return super().popitem()
+
+    def setdefault(self, key: str, default: Optional[str] = None):
+        self.version += 1
+        return super().setdefault(key, default)  # type: ignore
+
+    def update(self, *args: Any, **kwargs: str):
+        super().update(*args, **kwargs)
+        self.version += 1
+
 
 class ComponentType(Enum):
     action_row = 1
@@ -21,6 +97,11 @@ class ComponentType(Enum):
 class Translator:
     antecedent = GoogleTranslator()
     suppress_errors = True
+    batch_separator = "\n\u2042\n"
+    batch_limit = 4500
+    # Pack batches into single requests even when `translate` is overridden,
+    # only for translators that carry `batch_separator` through untouched
+    pack_requests = False
 
     def __init__(self) -> None:
         """
@@ -34,8 +115,68 @@ class Translator:
     ):
         """
         Batch translates text from source language to destination language.
+
+        Payloads are joined by `batch_separator` into as few requests of at
+        most `batch_limit` characters as possible and split back apart, if
+        the translator `packs` them. Otherwise they are translated one by one.
+        """
+        if not self.packs():
+            return [self.translate(text, dest_lang, src_lang) for text in payloads]
+        return self.packed(self.translate, payloads, dest_lang, src_lang)
+
+    def packs(self):
+        """
+        Returns whether if batches are packed into single requests, which is
+        the case for the googletrans backend and for translators that opt in
+        with `pack_requests`.
+        """
+        return self.pack_requests or type(self).translate is Translator.translate
+
+    def chunks(self, payloads: List[str]):
+        chunk: List[str] = []
+        size = 0
+        gap = len(self.batch_separator)
+        for text in payloads:
+            if chunk and size + gap + len(text) > self.batch_limit:
+                yield chunk
+                chunk, size = [], 0
+            size += len(text) + (gap if chunk else 0)
+            chunk.append(text)
+        if chunk:
+            yield chunk
+
+    def packed(
+        self,
+        translate: Callable[[str, Language, Language], str],
+        payloads: List[str],
+        dest_lang: Language,
+        src_lang: Language,
+    ):
         """
-        return [self.translate(text, dest_lang, src_lang) for text in payloads]
+        Translates payloads in packed requests through `translate`. A request
+        that does not split back into as many segments as it was packed from
+        is retried one payload at a time.
+        """
+        marker = self.batch_separator.strip()
+        results: List[str] = []
+        for chunk in self.chunks(payloads):
+            if len(chunk) > 1:
+                joined = self.batch_separator.join(chunk)
+                packed = translate(joined, dest_lang, src_lang)
+                segments = [part.strip("\n ") for part in packed.split(marker)]
+                if len(segments) == len(chunk):
+                    results.extend(segments)
+                    continue
+            results.extend(translate(text, dest_lang, src_lang) for text in chunk)
+        return results
+
+    def fetch(self, payload: str, dest_lang: Language, src_lang: Language) -> str:
+        """
+        Requests a translation from the backend, raising if it fails.
+        """
+        return self.antecedent.translate(
+            payload, dest=dest_lang.code, src=src_lang.code
+        ).text
 
     def translate(self, payload: str, dest_lang: Language, src_lang: Language):
         """
@@ -43,9 +184,7 @@ class Translator:
         If the payload cannot be translate, the original string is returned.
         """
         try:
-            return self.antecedent.translate(
-                payload, dest=dest_lang.code, src=src_lang.code
-            ).text
+            return self.fetch(payload, dest_lang, src_lang)
         except Exception as e:
             if not Translator.suppress_errors:
                 print_exception(e.__class__, e, e.__traceback__)
@@ -56,9 +195,165 @@ class Translator:
         pass
 
 
+class AsyncTranslator:
+    """
+    Interface for translators that never block the event loop.
+
+    Unlike `Translator.translate`, failures may be raised, in which case the
+    source text is kept and the failure is not cached.
+
+    Requests are limited to `max_concurrency` at a time per translator and to
+    `process_concurrency` at a time across every translator of the process.
+    """
+
+    max_concurrency = 8
+    process_concurrency = 32
+    # Translators that look up and cache translations on their own, which
+    # `TranslationAgent` then leaves to them
+    caches = False
+    process_slots: "WeakKeyDictionary[Any, asyncio.Semaphore]" = WeakKeyDictionary()
+
+    async def translate(
+        self, payload: str, dest_lang: Language, src_lang: Language
+    ) -> str:
+        raise NotImplementedError
+
+    async def batch_translate(
+        self, payloads: List[str], dest_lang: Language, src_lang: Language
+    ) -> List[str]:
+        """
+        Translates every payload concurrently within the concurrency limits,
+        results are in the order of the payloads.
+        """
+        return list(
+            await asyncio.gather(
+                *(
+                    self.bounded(self.translate(text, dest_lang, src_lang))
+                    for text in payloads
+                )
+            )
+        )
+
+    def slots(self):
+        """
+        Returns the process wide and the per translator semaphores of the
+        running event loop.
+        """
+        loop = asyncio.get_running_loop()
+        process = AsyncTranslator.process_slots.get(loop)
+        if process is None:
+            process = AsyncTranslator.process_slots[loop] = asyncio.Semaphore(
+                AsyncTranslator.process_concurrency
+            )
+        backend_slots = self.__dict__.setdefault("backend_slots", WeakKeyDictionary())
+        backend = backend_slots.get(loop)
+        if backend is None:
+            backend = backend_slots[loop] = asyncio.Semaphore(self.max_concurrency)
+        return process, backend
+
+    async def bounded(self, coro: Awaitable[T]) -> T:
+        """
+        Awaits a request once both concurrency limits allow it.
+        """
+        process, backend = self.slots()
+        async with process, backend:
+            return await coro
+
+    async def start(self):
+        """
+        Opens whatever the translator needs ahead of its first request.
+        """
+
+    async def close(self):
+        pass
+
+    @staticmethod
+    def wrap(translator: Union[Translator, "AsyncTranslator"]) -> "AsyncTranslator":
+        """
+        Returns the translator itself if it is asynchronous, otherwise a
+        `ThreadedTranslator` adapter that is shared per translator.
+        """
+        if isinstance(translator, AsyncTranslator):
+            return translator
+        adapter = ThreadedTranslator.adapters.get(translator)
+        if adapter is None:
+            adapter = ThreadedTranslator.adapters[translator] = ThreadedTranslator(
+                translator
+            )
+        return adapter
+
+
+class ThreadedTranslator(AsyncTranslator):
+    adapters: "WeakKeyDictionary[Translator, ThreadedTranslator]" = (
+        WeakKeyDictionary()
+    )
+
+    def __init__(self, translator: Translator, max_workers: int = 4) -> None:
+        """
+        Adapts a blocking `Translator` by running it in a bounded thread
+        pool of `max_workers` threads, which is also its concurrency limit.
+        """
+        self.translator = translator
+        self.max_concurrency = max_workers
+        self.executor = ThreadPoolExecutor(
+            max_workers, thread_name_prefix="i18n-translator"
+        )
+        # Translators overriding `translate` keep their own error handling
+        if type(translator).translate is Translator.translate:
+            self.call = translator.fetch
+        else:
+            self.call = translator.translate
+
+    async def run(self, fn: Callable[..., T], *args: Any) -> T:
+        """
+        Runs a blocking call in the thread pool once both concurrency limits
+        allow it, it is only submitted after that.
+        """
+        process, backend = self.slots()
+        async with process, backend:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self.executor, fn, *args)
+
+    async def translate(
+        self, payload: str, dest_lang: Language, src_lang: Language
+    ) -> str:
+        return await self.run(self.call, payload, dest_lang, src_lang)
+
+    async def batch_translate(
+        self, payloads: List[str], dest_lang: Language, src_lang: Language
+    ) -> List[str]:
+        """
+        Sends each packed request of the batch concurrently.
+        """
+        translator = self.translator
+        if type(translator).batch_translate is not Translator.batch_translate:
+            return await self.run(
+                translator.batch_translate, payloads, dest_lang, src_lang
+            )
+        if not translator.packs():
+            return list(
+                await asyncio.gather(
+                    *(self.translate(text, dest_lang, src_lang) for text in payloads)
+                )
+            )
+        packed = partial(translator.packed, self.call)
+        chunks = await asyncio.gather(
+            *(
+                self.run(packed, chunk, dest_lang, src_lang)
+                for chunk in translator.chunks(payloads)
+            )
+        )
+        return [result for chunk in chunks for result in chunk]
+
+    async def close(self):
+        if ThreadedTranslator.adapters.get(self.translator) is self:
+            del ThreadedTranslator.adapters[self.translator]
+        self.executor.shutdown(wait=False)
+
+
 class TranslationAgent:
     delim = "\u200b"
-    decoratives = {
+    decoratives = Decoratives({
         "`": "`",
         "```": "```",
         "*": "*",
@@ -71,22 +366,39 @@ class TranslationAgent:
         "<:": ">",
         "(": ")",
         delim: delim,
-    }
+    })
     # Add all possible entries codeblock starters
     decoratives.update({f"```{lang}\n": "```" for lang in CODEBLOCK_LANGS})
     ignored = {"<@", "<#", "<@&", "<!@", "<:", delim}
     cache = Cache()
+    message_cache = MessageCache()
+    # Professional translations consulted before the cache and the translator
+    catalog: Optional["CatalogTranslator"] = None
+    identifier = LanguageIdentifier()
+    # Tokenize with the original character by character loop instead of the
+    # compiled scanner, both produce the same tokens
+    legacy_tokenizer = False
+    # Prefix trie, closing decoratives and scanner patterns compiled from
+    # `decoratives`, along with the identity and version of the dict they
+    # were compiled from
+    compiled: Optional[Tuple[Any, ...]] = None
+    # Translations currently awaited from a backend, keyed on
+    # (phrase, source lang code, destination lang code)
+    inflight: Dict[Tuple[str, str, str], "asyncio.Future[Optional[str]]"] = {}
+    # Translations still filling the cache after their latency budget ran out
+    background: Set["asyncio.Task[Tuple[Dict[str, str], bool]]"] = set()
 
     def __init__(
         self,
         src_lang: Language,
         dest_lang: Language,
-        translator: Translator,
+        translator: Union[Translator, AsyncTranslator],
         enable_cache: bool = True,
     ) -> None:
         self.dest_lang = dest_lang
         self.src_lang = src_lang
         self.translator = translator
+        self.async_translator = AsyncTranslator.wrap(translator)
         if enable_cache:
             self.cache.load_cache_sync()
         self.enable_cache = enable_cache
@@ -95,18 +407,73 @@ class TranslationAgent:
         """
         Tokenizes the source string into segments to translate individually
         for better accuracy.
+
+        Whole strings that have been translated before are served from the
+        message cache without being tokenized again.
+        """
+        use_cache = self.enable_cache and self.dest_lang
+        catalogued = self.catalogued(content)
+        if catalogued is not None:
+            return catalogued
+        if use_cache:
+            cached = self.message_cache.get(content, self.src_lang, self.dest_lang)
+            if cached is not None:
+                return cached
+        translated = self.trans_assemble(content, self.tokenize(content))
+        if use_cache:
+            self.message_cache.set(content, self.src_lang, self.dest_lang, translated)
+        return translated
+
+    async def translate_async(self, content: str):
+        """
+        Same as `translate` except that translations are awaited from the
+        asynchronous translator so the event loop is never blocked.
+        """
+        return (await self.translate_many_async([content]))[0]
+
+    async def translate_many_async(
+        self, contents: List[str], latency_budget: Optional[float] = None
+    ):
+        """
+        Translates several strings at once. The tokens of every string are
+        pooled and deduplicated so that all of them are looked up and
+        translated together before each string is reassembled.
+
+        If the translations take longer than `latency_budget` seconds, the
+        strings are assembled from what is cached by then and the source
+        text for the rest, while the translations carry on in the background.
         """
-        cached = self.trans_assemble(content, self.tokenize(content))
-        return cached
+        use_cache = self.enable_cache and self.dest_lang
+        results: Dict[str, str] = {}
+        pending = []
+        for content in dict.fromkeys(contents):
+            cached = self.catalogued(content)
+            if use_cache and cached is None:
+                cached = self.message_cache.get(
+                    content, self.src_lang, self.dest_lang
+                )
+            if cached is not None:
+                results[content] = cached
+            else:
+                pending.append((content, self.tokenize(content)))
+
+        phrases = [tk.phrase for _, tokens in pending for tk in tokens]
+        translations, complete = await self.resolve_within(phrases, latency_budget)
+        for content, tokens in pending:
+            translated = self.assemble(
+                content, tokens, [translations[tk.phrase] for tk in tokens]
+            )
+            if use_cache and complete:
+                self.message_cache.set(
+                    content, self.src_lang, self.dest_lang, translated
+                )
+            results[content] = translated
+        return [results[content] for content in contents]
 
     @staticmethod
-    def translate_payload(
-        dest_lang: Language,
+    def collect_fields(
         payload: Dict[str, Any],
-        content: Optional[str],
         *,
-        source_lang: Language,
-        translator: Translator,
         translate_messages: bool,
         translate_embeds: bool,
         translate_buttons: bool,
@@ -115,18 +482,12 @@ class TranslationAgent:
         translate_components: bool,
     ):
         """
-        Shortcut to instantiating a TranslationAgent object and translating
-        dictionary fields.
-
-        Translates a payload JSON object about to be sent to it's corresponding
-        discord API Endpoint.
-
-        Returns (Payload, Content)
+        Walks a payload and returns every `(container, key)` pair holding a
+        string that should be translated.
         """
-        agent = TranslationAgent(source_lang, dest_lang, translator=translator)
-        if translate_messages:
-            if content:
-                content = agent.translate(content)
+        fields = []
+        if translate_messages and payload.get("content"):
+            fields.append((payload, "content"))
 
         if translate_embeds:
             if "embeds" in payload and payload["embeds"]:
@@ -142,34 +503,32 @@ class TranslationAgent:
                     embed = template_embed.copy()
                     if "fields" in embed:
                         for field in embed["fields"]:
-                            if field["name"].strip() and field["name"] != TranslationAgent.delim:
-                                field["name"] = agent.translate(field["name"])
-                            if field["value"].strip() and field["value"] != TranslationAgent.delim:
-                                field["value"] = agent.translate(field["value"])
+                            for key in ("name", "value"):
+                                if (
+                                    field[key].strip()
+                                    and field[key] != TranslationAgent.delim
+                                ):
+                                    fields.append((field, key))
 
                     if (
                         "author" in embed
                         and "name" in embed["author"]
                         and embed["author"]["name"].strip()
                     ):
-                        embed["author"]["name"] = agent.translate(
-                            embed["author"]["name"]
-                        )
+                        fields.append((embed["author"], "name"))
 
                     if (
                         "footer" in embed
                         and "text" in embed["footer"]
                         and embed["footer"]["text"].strip()
                     ):
-                        embed["footer"]["text"] = agent.translate(
-                            embed["footer"]["text"]
-                        )
+                        fields.append((embed["footer"], "text"))
 
                     if "description" in embed and embed["description"].strip():
-                        embed["description"] = agent.translate(embed["description"])
+                        fields.append((embed, "description"))
 
                     if "title" in embed and embed["title"].strip():
-                        embed["title"] = agent.translate(embed["title"])
+                        fields.append((embed, "title"))
                     embeds[i] = embed
 
             if len(embeds) > 1:
@@ -179,7 +538,7 @@ class TranslationAgent:
 
         if translate_components and "components" in payload and payload["components"]:
             if "title" in payload:
-                payload["title"] = agent.translate(payload["title"])
+                fields.append((payload, "title"))
             for i, template_row in enumerate(payload["components"]):
                 if template_row:
                     row = template_row.copy()
@@ -190,42 +549,83 @@ class TranslationAgent:
                             and item["type"] == ComponentType.button.value
                         ):
                             if item["label"]:
-                                item["label"] = agent.translate(item["label"])
+                                fields.append((item, "label"))
                         elif (
                             translate_selects
                             and item["type"] == ComponentType.select.value
                         ):
                             if "placeholder" in item and item["placeholder"]:
-                                item["placeholder"] = agent.translate(
-                                    item["placeholder"]
-                                )
+                                fields.append((item, "placeholder"))
                             for opt in item["options"]:
-                                opt["label"] = agent.translate(opt["label"])
+                                fields.append((opt, "label"))
                         elif (
                             translate_modals
                             and item["type"] == ComponentType.input_text.value
                         ):
                             if item["label"]:
-                                item["label"] = agent.translate(item["label"])
-                            if "placeholder" in item and item["placeholder"]:
-                                item["placeholder"] = agent.translate(
-                                    item["placeholder"]
-                                )
-                            if "value" in item and item["value"]:
-                                item["value"] = agent.translate(item["value"])
+                                fields.append((item, "label"))
+                            for key in ("placeholder", "value"):
+                                if key in item and item[key]:
+                                    fields.append((item, key))
 
                     payload["components"][i] = row
+        return fields
+
+    @staticmethod
+    async def translate_payload(
+        dest_lang: Language,
+        payload: Dict[str, Any],
+        content: Optional[str],
+        *,
+        source_lang: Language,
+        translator: Union[Translator, AsyncTranslator],
+        latency_budget: Optional[float] = None,
+        **flags: bool,
+    ):
+        """
+        Shortcut to instantiating a TranslationAgent object and translating
+        dictionary fields.
 
-        return payload, content
+        Translates a payload JSON object about to be sent to it's corresponding
+        discord API Endpoint. Every field enabled by the `translate_{x}` flags
+        is collected first, their tokens are translated together in one
+        batch and the results are written back. Fields not translated within
+        `latency_budget` seconds are sent as cached or in the source language.
+
+        Returns (Payload, Content)
+        """
+        agent = TranslationAgent(source_lang, dest_lang, translator=translator)
+        message = {"content": content}
+        fields = TranslationAgent.collect_fields(message, **flags)
+        fields.extend(
+            TranslationAgent.collect_fields(
+                payload, **{**flags, "translate_messages": False}
+            )
+        )
+        translated = await agent.translate_many_async(
+            [container[key] for container, key in fields], latency_budget
+        )
+        for (container, key), text in zip(fields, translated):
+            container[key] = text
+        return payload, message["content"]
 
     @staticmethod
     def encode_lang_str(source_lang: Language, s: str, dest_lang: Language):
         """
         Append the language code into the string with a delimiter.
+
+        Strings identified to already be in the destination language are left
+        as is, the identification is local and takes no network call. Strings
+        decided on before, or translated before, are not identified again.
         """
         same_lang = False
         if s:
-            same_lang = Translator.antecedent.detect(s).lang == dest_lang.code  # type: ignore
+            known = TranslationAgent.message_cache.same_language(s, dest_lang)
+            if known is None:
+                same_lang = TranslationAgent.identifier.identify(s) is dest_lang
+                TranslationAgent.message_cache.decide(s, dest_lang, same_lang)
+            else:
+                same_lang = known
 
         if not same_lang and dest_lang is not source_lang:
             return f"{s or ''}{TranslationAgent.delim}{dest_lang.code}"
@@ -250,7 +650,153 @@ class TranslationAgent:
         )
 
     @staticmethod
-    def tokenize(string: str):
+    def compile_decoratives():
+        """
+        Returns the prefix trie of the decoratives, where nodes map the next
+        character to their children and hold an empty key when their prefix
+        is a decorative, the set of closing decoratives, and the patterns of
+        the characters that may open or close a decorative, without and with
+        any other non whitespace character.
+
+        They are compiled again whenever `decoratives` is replaced or edited.
+        Edits made in place to a plain dict rather than to `Decoratives` are
+        only noticed when they resize it, otherwise call `recompile`.
+        """
+        decoratives = TranslationAgent.decoratives
+        version = getattr(decoratives, "version", 0)
+        key = (id(decoratives), len(decoratives), version)
+        compiled = TranslationAgent.compiled
+        if compiled is None or compiled[0] != key:
+            trie: Dict[str, Any] = {}
+            for decor in decoratives:
+                node = trie
+                for char in decor:
+                    node = node.setdefault(char, {})
+                node[""] = True
+            closers = set(decoratives.values())
+            specials = {
+                decor[0]
+                for decor in decoratives
+                if decor and (len(decor) == 1 or decor[0] not in ascii_letters)
+            }
+            specials.update(closer for closer in closers if len(closer) == 1)
+            special = "".join(sorted(map(re.escape, specials))) or "^\\s\\S"
+            compiled = TranslationAgent.compiled = (
+                key,
+                trie,
+                closers,
+                re.compile(f"[{special}]"),
+                re.compile(f"[{special}]|\\S"),
+            )
+        return compiled[1:]
+
+    @staticmethod
+    def recompile():
+        """
+        Compiles the decoratives again on the next tokenization.
+        """
+        TranslationAgent.compiled = None
+
+    @staticmethod
+    def match_decor(string: str, i: int, trie: Optional[Dict[str, Any]] = None):
+        """
+        Returns the decorative starting at `i` along with the position of its
+        last character, or the character at `i` and `i` if there is none.
+
+        The trie is followed for as long as the string continues a prefix of
+        some decorative, as scanning `similar_decors` one character at a time
+        did. Only the prefix where it stops can match, and a prefix broken by
+        the last character of the string never does.
+
+        Tokenizers pass the `trie` they compiled once for the whole string.
+        """
+        if trie is None:
+            trie = TranslationAgent.compile_decoratives()[0]
+        string_len = len(string)
+        node = trie.get(string[i])
+        last = None
+        j = i
+        while node is not None and j + 1 != string_len:
+            j += 1
+            last, node = node, node.get(string[j])
+        if node is not None:
+            if "" in node:
+                return string[i : j + 1], j
+        elif last is not None and j + 1 != string_len and "" in last:
+            return string[i:j], j - 1
+        return string[i], i
+
+    @staticmethod
+    def tokenize(string: str) -> List[Token]:
+        """
+        Splits a string into the tokens to translate, with the compiled
+        scanner or with the original loop if `legacy_tokenizer` is set.
+        """
+        if TranslationAgent.legacy_tokenizer:
+            return [
+                Token(tk["start_pos"], tk["end_pos"], tk["phrase"])
+                for tk in TranslationAgent.legacy_tokenize(string)
+            ]
+        return TranslationAgent.scan(string)
+
+    @staticmethod
+    def scan(string: str) -> List[Token]:
+        """
+        Tokenizes a string in a single pass.
+
+        Since opening a decorative concludes the current token, at most one
+        token or decorative is open at any time. The scanner only stops at
+        characters that may open or close a decorative, or at any non
+        whitespace character while nothing is open, and skips everything in
+        between.
+        """
+        trie, closers, special, start = TranslationAgent.compile_decoratives()
+        decoratives = TranslationAgent.decoratives
+        ignored = TranslationAgent.ignored
+        match_decor = TranslationAgent.match_decor
+        tokens: List[Token] = []
+        # The open token or decorative and where its content starts
+        opened: Optional[str] = None
+        opened_pos = 0
+
+        def conclude(end: int):
+            phrase = string[opened_pos:end]
+            if not phrase.strip():
+                return
+            first = opened_pos + len(phrase) - len(phrase.lstrip(punctuation))
+            end -= len(phrase) - len(phrase.rstrip(trailing_punctuation))
+            if first < end:
+                tokens.append(Token(first, end, string[first:end]))
+
+        string_len = len(string)
+        i = 0
+        while True:
+            found = (special if opened is not None else start).search(string, i)
+            if found is None:
+                break
+            i = found.start()
+            char = string[i]
+            last = i
+            if char not in ascii_letters:
+                char, last = match_decor(string, i, trie)
+
+            if opened in ignored:
+                if char == decoratives[opened]:  # type: ignore
+                    opened = None
+            elif char in decoratives or char in closers:
+                if opened is not None:
+                    conclude(i)
+                opened, opened_pos = char, last + 1
+            elif opened is None and char.strip():
+                opened, opened_pos = char, i
+            i = last + 1
+
+        if opened is not None and opened not in ignored:
+            conclude(string_len)
+        return tokens
+
+    @staticmethod
+    def legacy_tokenize(string: str):
         """
         Create "tokens" from a general string.
 
@@ -305,27 +851,13 @@ class TranslationAgent:
             if phrase:
                 tokens.append({"start_pos": start, "end_pos": end, "phrase": phrase})
 
+        trie, closers = TranslationAgent.compile_decoratives()[:2]
         string_len = len(string)
         while i < string_len:
             char = string[i]
 
             if char not in ascii_letters:
-                tmp_char = char
-                tmp_pos = int(i)
-                sample = TranslationAgent.similar_decors(char)
-                while sample and i + 1 != string_len:
-                    i += 1
-                    char += string[i]
-                    sample = TranslationAgent.similar_decors(char)
-
-                # loop oversteps one character if not EOF
-                if i + 1 != string_len:
-                    char = char[:-1]
-                    i -= 1
-
-                if char not in TranslationAgent.decoratives:
-                    char = tmp_char
-                    i = tmp_pos
+                char, i = TranslationAgent.match_decor(string, i, trie)
 
             char_pos = i
             if stack and stack[-1]["char"] in TranslationAgent.ignored:
@@ -333,10 +865,7 @@ class TranslationAgent:
                 # has not met it's end
                 if char == TranslationAgent.decoratives[stack[-1]["char"]]:
                     stack.pop()
-            elif (
-                char in TranslationAgent.decoratives
-                or char in TranslationAgent.decoratives.values()
-            ):
+            elif char in TranslationAgent.decoratives or char in closers:
                 generate_token(char)
                 # post is incremented by one since when making a token
                 # we expect the starting position from one after the
@@ -352,36 +881,200 @@ class TranslationAgent:
 
         return tokens
 
-    def trans_assemble(self, payload: str, tokens: List[Dict[str, Any]]):
+    def trans_assemble(self, payload: str, tokens: List[Token]):
         """
         Re-assembles the tokens into a new string translated to the destination
         language.
 
         Parameters:
             payload: the original string that is tokenized
-            tokens: a list of dictionaries about token data
+            tokens: the tokens of the string
         """
-        new_str = list(payload)
-        mitigate = 0
+        phrases = [tk.phrase for tk in tokens]
+        if not self.dest_lang:
+            return self.assemble(payload, tokens, phrases)
 
-        for tk in tokens:
-            phrase = tk["phrase"]
+        translations, misses = self.lookup(phrases)
+        if misses:
+            if not isinstance(self.translator, Translator):
+                raise TypeError(
+                    f"{type(self.translator).__name__} is asynchronous, "
+                    "use translate_async instead"
+                )
+            translated = self.translator.batch_translate(
+                misses, dest_lang=self.dest_lang, src_lang=self.src_lang
+            )
+            self.remember(misses, translated, translations)
+        return self.assemble(payload, tokens, [translations[p] for p in phrases])
 
-            if self.dest_lang:
-                cached = None
-                if self.enable_cache:
-                    cached = self.cache.get_cache(phrase, self.dest_lang)
+    async def trans_assemble_async(self, payload: str, tokens: List[Token]):
+        """
+        Same as `trans_assemble` except that translations are awaited from the
+        asynchronous translator.
+        """
+        translations, _ = await self.resolve_async([tk.phrase for tk in tokens])
+        return self.assemble(
+            payload, tokens, [translations[tk.phrase] for tk in tokens]
+        )
+
+    async def resolve_async(self, phrases: List[str]):
+        """
+        Maps every phrase to its translation, translating the cache misses in
+        a single batch. Phrases whose translation fails are kept in the
+        source language and are not cached. Also returns whether if every
+        phrase was translated.
+        """
+        if not self.dest_lang:
+            return {phrase: phrase for phrase in phrases}, True
+
+        translations, misses = self.lookup(phrases)
+        if misses:
+            return translations, await self.translate_misses(misses, translations)
+        return translations, True
 
-                if not cached:
-                    cached = self.translator.translate(
-                        phrase, dest_lang=self.dest_lang, src_lang=self.src_lang
-                    )
-                    if self.enable_cache:
-                        self.cache.set_cache(phrase, self.dest_lang, cached)
+    async def resolve_within(self, phrases: List[str], budget: Optional[float]):
+        """
+        Same as `resolve_async` but gives up waiting after `budget` seconds,
+        returning the cached translations and the source text for every other
+        phrase. Also returns whether if every phrase was resolved in time.
+        """
+        if budget is None:
+            return await self.resolve_async(phrases)
+        task = asyncio.ensure_future(self.resolve_async(phrases))
+        try:
+            return await asyncio.wait_for(asyncio.shield(task), budget)
+        except asyncio.TimeoutError:
+            self.background.add(task)
+            task.add_done_callback(self.background.discard)
+        translations, misses = self.lookup(phrases)
+        translations.update((phrase, phrase) for phrase in misses)
+        return translations, False
+
+    async def translate_misses(self, misses: List[str], translations: Dict[str, str]):
+        """
+        Translates cache misses into `translations`. A phrase that is already
+        being translated into the same language by a concurrent call awaits
+        that call instead of sending its own request.
+
+        Returns whether if every miss was translated, which is not the case
+        when the translator fails or leaves a phrase untranslated.
+        """
+        loop = asyncio.get_running_loop()
+        owned: Dict[str, "asyncio.Future[Optional[str]]"] = {}
+        waiting: Dict[str, "asyncio.Future[Optional[str]]"] = {}
+        complete = True
+        for phrase in misses:
+            key = (phrase, self.src_lang.code, self.dest_lang.code)
+            if key in self.inflight:
+                waiting[phrase] = self.inflight[key]
+            else:
+                owned[phrase] = self.inflight[key] = loop.create_future()
+
+        try:
+            if owned:
+                translated = await self.async_translator.batch_translate(
+                    list(owned), dest_lang=self.dest_lang, src_lang=self.src_lang
+                )
+                self.remember(list(owned), translated, translations)
+                for future, result in zip(owned.values(), translated):
+                    future.set_result(result or None)
+                    complete = complete and bool(result)
+        except Exception as e:
+            complete = False
+            if not Translator.suppress_errors:
+                print_exception(e.__class__, e, e.__traceback__)
+        finally:
+            for phrase, future in owned.items():
+                del self.inflight[(phrase, self.src_lang.code, self.dest_lang.code)]
+                if not future.done():
+                    future.set_result(None)
+                translations.setdefault(phrase, phrase)
 
-                phrase = cached
+        for phrase, future in waiting.items():
+            result = await asyncio.shield(future)
+            translations[phrase] = result or phrase
+            complete = complete and bool(result)
+        return complete
 
-            new_str[tk["start_pos"] + mitigate: tk["end_pos"] + mitigate] = phrase
-            if tk["end_pos"] - tk["start_pos"] != len(phrase):
-                mitigate += len(phrase) - (tk["end_pos"] - tk["start_pos"])
-        return "".join(new_str)
+    def catalogued(self, text: str):
+        """
+        Returns the catalog translation of a text if there is one.
+        """
+        if self.catalog is None or not self.dest_lang:
+            return None
+        return self.catalog.lookup(text, self.dest_lang)
+
+    def lookup(self, phrases: List[str]):
+        """
+        Looks up every distinct phrase in the catalog and then the cache and
+        returns the found translations along with the phrases that still need
+        translating.
+        """
+        translations: Dict[str, str] = {}
+        distinct = []
+        for phrase in dict.fromkeys(phrases):
+            catalogued = self.catalogued(phrase)
+            if catalogued is None:
+                distinct.append(phrase)
+            else:
+                translations[phrase] = catalogued
+        if self.caching():
+            cached = self.cache.get_many(distinct, self.dest_lang)
+        else:
+            cached = [None] * len(distinct)
+        translations.update((p, c) for p, c in zip(distinct, cached) if c)
+        return translations, [p for p, c in zip(distinct, cached) if not c]
+
+    def remember(
+        self, misses: List[str], translated: List[str], translations: Dict[str, str]
+    ):
+        for phrase, result in zip(misses, translated):
+            translations[phrase] = result or phrase
+            if self.caching() and result:
+                self.cache.set_cache(phrase, self.dest_lang, result)
+
+    def caching(self):
+        """
+        Returns whether if phrases are looked up in and written to the cache
+        by the agent rather than by its translator.
+        """
+        return self.enable_cache and not self.async_translator.caches
+
+    @staticmethod
+    def assemble(
+        payload: str,
+        tokens: Iterable[Union[Token, Sequence[int], Dict[str, Any]]],
+        translations: Iterable[str],
+    ):
+        """
+        Replaces every token of the original string with its translation,
+        joining the untouched slices between tokens and the translations in a
+        single pass over the tokens in order.
+
+        Tokens may also be `(start_pos, end_pos)` pairs or token dicts.
+        """
+        spans = (
+            (tk["start_pos"], tk["end_pos"]) if isinstance(tk, dict) else tk
+            for tk in tokens
+        )
+        parts = []
+        pos = 0
+        for (start, end, *_), phrase in zip(spans, translations):
+            parts.append(payload[pos:start])
+            parts.append(phrase)
+            pos = end
+        parts.append(payload[pos:])
+        return "".join(parts)
+
+    @staticmethod
+    def assemble_spans(
+        payload: str,
+        starts: Sequence[int],
+        ends: Sequence[int],
+        translations: Iterable[str],
+    ):
+        """
+        Same as `assemble` but from precomputed arrays of token positions,
+        e.g. `array("I")`s kept for a payload that is streamed.
+        """
+        return TranslationAgent.assemble(payload, zip(starts, ends), translations)
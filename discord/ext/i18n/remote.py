@@ -0,0 +1,285 @@
+import json
+import anyio
+import socket
+import argparse
+import threading
+import socketserver
+
+from os import path, remove
+from time import monotonic
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from .cache import Cache
+from .language import Language
+
+DEFAULT_SOCKET = "/tmp/discord-ext-i18n.sock"
+
+
+class Channel:
+    def __init__(self, socket_path: str, timeout: float) -> None:
+        """
+        A connection to a `CacheServer` that is made lazily and dropped on
+        any error, so that the next request reconnects.
+        """
+        self.socket_path = socket_path
+        self.timeout = timeout
+        self.connection: Optional[socket.socket] = None
+        self.stream: Any = None
+        self.lock = threading.Lock()
+
+    def connect(self):
+        self.connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.connection.settimeout(self.timeout)
+        try:
+            self.connection.connect(self.socket_path)
+        except OSError:
+            self.disconnect()
+            raise
+        self.stream = self.connection.makefile("rwb")
+
+    def disconnect(self):
+        if self.stream is not None:
+            try:
+                self.stream.close()
+            except OSError:
+                pass
+        if self.connection is not None:
+            self.connection.close()
+        self.connection = self.stream = None
+
+    def pipeline(self, *requests: Tuple[str, Any]) -> List[Any]:
+        """
+        Sends every request before reading any of the responses back.
+        """
+        with self.lock:
+            if self.stream is None:
+                self.connect()
+            try:
+                self.stream.write(
+                    b"".join(
+                        json.dumps(request, ensure_ascii=False).encode("utf-8")
+                        + b"\n"
+                        for request in requests
+                    )
+                )
+                self.stream.flush()
+                return [json.loads(self.stream.readline()) for _ in requests]
+            except (OSError, ValueError):
+                self.disconnect()
+                raise
+
+    def close(self):
+        with self.lock:
+            self.disconnect()
+
+
+class RemoteCache(Cache):
+    def __init__(
+        self,
+        socket_path: str = DEFAULT_SOCKET,
+        flush_interval: float = 1.0,
+        flush_threshold: int = 64,
+        timeout: float = 1.0,
+        lookup_timeout: float = 0.05,
+        retry_interval: float = 5.0,
+    ) -> None:
+        """
+        A translation cache shared between processes through a `CacheServer`
+        listening on a Unix socket.
+
+        Messages are newline delimited JSON. Lookups are answered in one
+        round trip, `get_many` batches several phrases into one request and
+        new entries are pipelined to the server in batches by the flusher.
+        Entries that are not flushed yet are served locally.
+
+        Lookups and writes go through connections of their own, so that a
+        lookup never waits on a flush. The server is connected to lazily and
+        reconnected to after an error. While it is unreachable, new entries
+        are held back until the next flush that gets through.
+
+        Parameters
+        ----------
+        timeout: float
+            Seconds a write may take before it is held back
+        lookup_timeout: float
+            Seconds a lookup may take before it misses
+        retry_interval: float
+            Seconds lookups miss right away for after one failed, instead of
+            reconnecting
+        """
+        super().__init__(
+            flush_interval=flush_interval, flush_threshold=flush_threshold
+        )
+        self.socket_path = socket_path
+        self.writer = Channel(socket_path, timeout)
+        self.reader = Channel(socket_path, lookup_timeout)
+        self.retry_interval = retry_interval
+        self.retry_at = 0.0
+        self.pending: Dict[Tuple[str, str], str] = {}
+        self.unsent: List[Tuple[str, Optional[str], Optional[str]]] = []
+
+    def request(self, op: str, args: Any = None):
+        return self.writer.pipeline((op, args))[0]
+
+    def load_cache_sync(self):
+        self.sync_loaded = True
+
+    async def load_cache(self):
+        self.load_cache_sync()
+
+    def write_entries(self, entries: List[Tuple[str, Optional[str], Optional[str]]]):
+        entries = self.unsent + entries
+        try:
+            self.request("set", entries)
+        except (OSError, ValueError):
+            # Sent along with the next batch, served from `pending` until then
+            self.unsent = entries
+            return
+        self.unsent = []
+        for src, lang_code, _ in entries:
+            self.pending.pop((src, lang_code), None)  # type: ignore
+
+    async def append_journal(
+        self, entries: Iterable[Tuple[str, Optional[str], Optional[str]]]
+    ):
+        entries = list(entries)
+        if entries:
+            await anyio.to_thread.run_sync(self.write_entries, entries)
+
+    async def flush(self):
+        if self.dirty or self.unsent:
+            entries, self.dirty = self.dirty, []
+            await anyio.to_thread.run_sync(self.write_entries, entries)
+
+    async def compact(self):
+        await anyio.to_thread.run_sync(self.request, "save")
+
+    def flush_sync(self):
+        entries, self.dirty = self.dirty, []
+        if entries or self.unsent:
+            self.write_entries(entries)
+
+    async def close(self):
+        await super().close()
+        self.writer.close()
+        self.reader.close()
+
+    async def empty(self):
+        self.dirty = []
+        self.pending.clear()
+        await anyio.to_thread.run_sync(self.request, "empty")
+
+    def set_cache(self, src: str, lang: Language, translated: str):
+        self.pending[(src, lang.code)] = translated
+        self.dirty.append((src, lang.code, translated))
+        self.schedule_flush()
+
+    def get_many(self, srcs: Iterable[str], lang: Language) -> List[Optional[str]]:
+        srcs = list(srcs)
+        results = [self.pending.get((src, lang.code)) for src in srcs]
+        missing = [src for src, cached in zip(srcs, results) if cached is None]
+        if missing and monotonic() >= self.retry_at:
+            try:
+                found = iter(self.reader.pipeline(("get", [missing, lang.code]))[0])
+            except (OSError, ValueError):
+                self.retry_at = monotonic() + self.retry_interval
+                return results
+            results = [
+                next(found) if cached is None else cached for cached in results
+            ]
+        return results
+
+    def get_cache(self, src: str, lang: Language):
+        return self.get_many([src], lang)[0]
+
+
+class CacheRequestHandler(socketserver.StreamRequestHandler):
+    server: "CacheServer"
+
+    def handle(self):
+        for line in self.rfile:
+            op, args = json.loads(line)
+            response = json.dumps(self.server.dispatch(op, args), ensure_ascii=False)
+            self.wfile.write(response.encode("utf-8") + b"\n")
+            self.wfile.flush()
+
+
+class CacheServer(socketserver.ThreadingUnixStreamServer):
+    daemon_threads = True
+
+    def __init__(
+        self, socket_path: str = DEFAULT_SOCKET, cache: Optional[Cache] = None
+    ):
+        """
+        A small local cache daemon that serves a `Cache` to every
+        `RemoteCache` connected to its Unix socket. It can be run on its own
+        with `python -m discord.ext.i18n.remote`.
+
+        Entries received from clients are journaled by the backing cache as
+        soon as their batch arrives.
+
+        Unix sockets are not available everywhere, hence this module is not
+        imported by the package and has to be imported explicitly.
+        """
+        if path.exists(socket_path):
+            remove(socket_path)
+        super().__init__(socket_path, CacheRequestHandler)
+        self.socket_path = socket_path
+        self.cache = cache or Cache()
+        self.cache.load_cache_sync()
+        self.cache_lock = threading.Lock()
+        self.thread: Optional[threading.Thread] = None
+
+    def dispatch(self, op: str, args: Any):
+        cache = self.cache
+        with self.cache_lock:
+            if op == "get":
+                srcs, lang_code = args
+                lang = Language.from_code(lang_code)
+                return cache.get_many(srcs, lang)  # type: ignore
+            elif op == "set":
+                for src, lang_code, translated in args:
+                    lang = Language.from_code(lang_code) if lang_code else None
+                    if lang is not None:
+                        cache.set_cache(src, lang, translated)
+                cache.flush_sync()
+                if cache.journal_size >= cache.compact_threshold:
+                    anyio.run(cache.compact)
+            elif op == "save":
+                cache.flush_sync()
+                anyio.run(cache.compact)
+            elif op == "empty":
+                anyio.run(cache.empty)
+            else:
+                return {"error": f"unknown operation {op!r}"}
+        return None
+
+    def start(self):
+        """
+        Serves on a background daemon thread.
+        """
+        self.thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+        if path.exists(self.socket_path):
+            remove(self.socket_path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Shared discord-ext-i18n cache")
+    parser.add_argument("--socket", default=DEFAULT_SOCKET)
+    parser.add_argument("--dir", default="__lang_cache__")
+    args = parser.parse_args()
+    server = CacheServer(args.socket, Cache(args.dir))
+    try:
+        server.serve_forever()
+    finally:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
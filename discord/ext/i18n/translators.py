@@ -0,0 +1,633 @@
+import aiohttp
+import asyncio
+import gettext
+
+from os import listdir, path
+from time import monotonic
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    List,
+    Optional,
+    TypeVar,
+    Union,
+)
+
+from .cache import Cache
+from .language import Language
+from .preprocess import AsyncTranslator, TranslationAgent, Translator
+
+T = TypeVar("T")
+
+
+class TokenBucket:
+    def __init__(self, rate: float, burst: Optional[float] = None) -> None:
+        """
+        Admits up to `rate` requests per second on average, with bursts of up
+        to `burst` requests after a quiet period.
+        """
+        self.rate = rate
+        self.burst = burst if burst is not None else max(rate, 1.0)
+        self.tokens = self.burst
+        self.updated = monotonic()
+        self.lock: Optional[asyncio.Lock] = None
+
+    def refill(self):
+        now = monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self, tokens: float = 1.0):
+        """
+        Waits until `tokens` tokens are available and takes them. Waiters are
+        served in order of arrival.
+        """
+        if self.lock is None:
+            self.lock = asyncio.Lock()
+        async with self.lock:
+            self.refill()
+            while self.tokens < tokens:
+                await asyncio.sleep((tokens - self.tokens) / self.rate)
+                self.refill()
+            self.tokens -= tokens
+
+
+class RateLimitedTranslator(AsyncTranslator):
+    # Default per backend configuration, each can be overridden on init
+    rate = 5.0
+    burst: Optional[float] = None
+    min_rate = 0.5
+    max_concurrency = 8
+    min_concurrency = 1
+    latency_target = 2.0
+    increase = 1.0
+    decrease = 0.5
+    retries = 2
+    backoff = 0.5
+    max_backoff = 30.0
+    options = (
+        "rate",
+        "burst",
+        "min_rate",
+        "max_concurrency",
+        "min_concurrency",
+        "latency_target",
+        "increase",
+        "decrease",
+        "retries",
+        "backoff",
+        "max_backoff",
+    )
+
+    def __init__(
+        self, translator: Union[Translator, AsyncTranslator], **config: Any
+    ) -> None:
+        """
+        Wraps a translator to keep its backend within quota.
+
+        Requests are admitted by a token bucket of `rate` requests per second
+        and by a concurrency limit that adapts AIMD style: it grows by
+        `increase` per round trip while requests succeed within
+        `latency_target` seconds, and is multiplied by `decrease` when one
+        fails or is slower. Failures also cut the request rate the same way
+        down to `min_rate`, which then recovers additively.
+
+        Failed requests are retried `retries` times after an exponential
+        backoff starting at `backoff` seconds. Packed requests of a blocking
+        `Translator` are each admitted as one request.
+        """
+        for name, value in config.items():
+            if name not in self.options:
+                raise TypeError(f"unknown rate limit option {name!r}")
+            setattr(self, name, value)
+        self.translator = translator
+        self.backend = AsyncTranslator.wrap(translator)
+        self.bucket = TokenBucket(self.rate, self.burst)
+        self.limit = float(self.max_concurrency)
+        self.active = 0
+        self.failures = 0
+        self.condition: Optional[asyncio.Condition] = None
+
+    async def acquire(self):
+        if self.condition is None:
+            self.condition = asyncio.Condition()
+        async with self.condition:
+            await self.condition.wait_for(lambda: self.active < int(self.limit))
+            self.active += 1
+        try:
+            await self.bucket.acquire()
+        except BaseException:
+            # Cancelled while waiting on the bucket, e.g. by a tier timeout
+            await self.release()
+            raise
+
+    async def release(self):
+        assert self.condition is not None
+        # Freed before taking the lock so that a cancelled release cannot leak
+        self.active -= 1
+        async with self.condition:
+            self.condition.notify_all()
+
+    def succeeded(self, latency: float):
+        self.failures = 0
+        if latency > self.latency_target:
+            self.slow_down(rate=False)
+            return
+        self.limit = min(
+            float(self.max_concurrency), self.limit + self.increase / self.limit
+        )
+        self.bucket.rate = min(self.rate, self.bucket.rate + self.increase / self.limit)
+
+    def slow_down(self, rate: bool = True):
+        self.limit = max(float(self.min_concurrency), self.limit * self.decrease)
+        if rate:
+            self.bucket.rate = max(self.min_rate, self.bucket.rate * self.decrease)
+
+    async def call(self, fn: Callable[..., Awaitable[T]], *args: Any) -> T:
+        """
+        Awaits a backend request once admitted, adapting the limits to its
+        outcome and retrying it if it fails.
+        """
+        attempt = 0
+        while True:
+            await self.acquire()
+            started = monotonic()
+            try:
+                result = await fn(*args)
+            except Exception:
+                self.failures += 1
+                self.slow_down()
+                if attempt == self.retries:
+                    raise
+            else:
+                self.succeeded(monotonic() - started)
+                return result
+            finally:
+                await self.release()
+            await asyncio.sleep(min(self.max_backoff, self.backoff * 2**attempt))
+            attempt += 1
+
+    async def translate(
+        self, payload: str, dest_lang: Language, src_lang: Language
+    ) -> str:
+        return await self.call(self.backend.translate, payload, dest_lang, src_lang)
+
+    async def batch_translate(
+        self, payloads: List[str], dest_lang: Language, src_lang: Language
+    ) -> List[str]:
+        translator = self.translator
+        if isinstance(translator, Translator) and translator.packs():
+            groups = list(translator.chunks(payloads))
+        else:
+            groups = [[payload] for payload in payloads]
+        results = await asyncio.gather(
+            *(
+                self.call(self.backend.batch_translate, group, dest_lang, src_lang)
+                for group in groups
+            )
+        )
+        return [result for group in results for result in group]
+
+    async def start(self):
+        await self.backend.start()
+
+    async def close(self):
+        await self.backend.close()
+
+
+class CircuitOpenError(Exception):
+    """
+    Raised instead of calling a backend that is failing or too slow.
+    """
+
+
+class CircuitBreaker(AsyncTranslator):
+    def __init__(
+        self,
+        translator: Union[Translator, AsyncTranslator],
+        failure_threshold: int = 5,
+        slow_threshold: Optional[float] = 5.0,
+        reset_timeout: float = 30.0,
+    ) -> None:
+        """
+        Wraps a translator to skip its backend entirely while it is failing
+        or slow, so that messages go out in the source language right away
+        instead of waiting on requests that are bound to fail.
+
+        Parameters
+        ----------
+        failure_threshold: int
+            Consecutive failed or slow requests after which the circuit opens
+            and requests raise `CircuitOpenError` without being sent
+        slow_threshold: float
+            Seconds after which a successful request still counts as a
+            failure, `None` to only count errors
+        reset_timeout: float
+            Seconds the circuit stays open before a single probe request is
+            let through, closing the circuit again if it succeeds
+        """
+        self.translator = translator
+        self.backend = AsyncTranslator.wrap(translator)
+        self.failure_threshold = failure_threshold
+        self.slow_threshold = slow_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self.probing = False
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return "closed"
+        if monotonic() - self.opened_at < self.reset_timeout or self.probing:
+            return "open"
+        return "half-open"
+
+    def record(self, succeeded: bool):
+        if succeeded:
+            self.failures = 0
+            self.opened_at = None
+            return
+        self.failures += 1
+        if self.opened_at is not None or self.failures >= self.failure_threshold:
+            self.opened_at = monotonic()
+
+    async def call(self, fn: Callable[..., Awaitable[T]], *args: Any) -> T:
+        state = self.state
+        if state == "open":
+            raise CircuitOpenError("translation backend is unavailable")
+        # Only the probe decides a half-open circuit, calls sent before the
+        # circuit opened settle without touching it
+        probe = state == "half-open"
+        if probe:
+            self.probing = True
+        started = monotonic()
+        try:
+            result = await fn(*args)
+        except Exception:
+            if probe or self.opened_at is None:
+                self.record(False)
+            raise
+        finally:
+            if probe:
+                self.probing = False
+        latency = monotonic() - started
+        if probe or self.opened_at is None:
+            self.record(self.slow_threshold is None or latency <= self.slow_threshold)
+        return result
+
+    async def translate(
+        self, payload: str, dest_lang: Language, src_lang: Language
+    ) -> str:
+        return await self.call(self.backend.translate, payload, dest_lang, src_lang)
+
+    async def batch_translate(
+        self, payloads: List[str], dest_lang: Language, src_lang: Language
+    ) -> List[str]:
+        return await self.call(
+            self.backend.batch_translate, payloads, dest_lang, src_lang
+        )
+
+    async def start(self):
+        await self.backend.start()
+
+    async def close(self):
+        await self.backend.close()
+
+
+class CatalogTranslator(Translator):
+    def __init__(
+        self,
+        localedir: Optional[str] = None,
+        domain: str = "messages",
+        fallback: Optional[Translator] = None,
+    ) -> None:
+        """
+        Translates from compiled gettext catalogs without any network call.
+        Every message of a catalog is indexed in memory per language, so
+        lookups take constant time and always give the same translation.
+
+        Set it as `TranslationAgent.catalog`, or pass it as `catalog` to
+        `AutoI18nAgent`, to consult it before the cache and the translator.
+
+        Parameters
+        ----------
+        localedir: str
+            Directory laid out as `localedir/<locale>/LC_MESSAGES/<domain>.mo`
+            where locales are named like `fr` or `zh_CN`
+        domain: str
+            Name of the catalogs to load
+        fallback: Translator
+            Translator used for the messages missing from the catalogs, they
+            are left untranslated otherwise
+        """
+        self.catalogs: Dict[str, Dict[str, str]] = {}
+        self.fallback = fallback
+        if localedir is not None:
+            for locale in listdir(localedir):
+                lang = self.language_of(locale)
+                pth = path.join(localedir, locale, "LC_MESSAGES", f"{domain}.mo")
+                if lang is not None and path.exists(pth):
+                    self.load(lang, pth)
+
+    @staticmethod
+    def language_of(locale: str):
+        """
+        Resolves a gettext locale name such as `pt_BR.UTF-8` to a language.
+        """
+        code = locale.split(".")[0].replace("_", "-").lower()
+        return Language.from_code(code) or Language.from_code(code.split("-")[0])
+
+    def load(self, lang: Language, pth: str):
+        """
+        Adds the messages of a compiled catalog to the index of a language.
+        """
+        with open(pth, "rb") as f:
+            catalog = gettext.GNUTranslations(f)._catalog  # type: ignore
+        self.catalogs.setdefault(lang.code, {}).update(
+            (msgid, msgstr)
+            for msgid, msgstr in catalog.items()
+            if isinstance(msgid, str) and msgid and msgstr
+        )
+
+    def lookup(self, text: str, lang: Language) -> Optional[str]:
+        catalog = self.catalogs.get(lang.code)
+        return catalog.get(text) if catalog else None
+
+    def fetch(self, payload: str, dest_lang: Language, src_lang: Language) -> str:
+        translated = self.lookup(payload, dest_lang)
+        if translated is not None:
+            return translated
+        if self.fallback is None:
+            raise LookupError(f"{payload!r} is not in the {dest_lang.code} catalog")
+        return self.fallback.fetch(payload, dest_lang, src_lang)
+
+    def batch_translate(
+        self, payloads: List[str], dest_lang: Language, src_lang: Language
+    ):
+        """
+        Looks every payload up in the catalogs and batch translates the
+        misses through the fallback. Misses without a fallback are returned
+        as empty strings so that they are neither translated nor cached.
+        """
+        results = [self.lookup(text, dest_lang) for text in payloads]
+        misses = [text for text, found in zip(payloads, results) if found is None]
+        if misses and self.fallback is not None:
+            fetched = iter(self.fallback.batch_translate(misses, dest_lang, src_lang))
+        else:
+            fetched = iter([""] * len(misses))
+        return [next(fetched) if found is None else found for found in results]
+
+
+class HttpTranslator(AsyncTranslator):
+    url = "https://translate.googleapis.com/translate_a/single"
+
+    def __init__(
+        self,
+        url: Optional[str] = None,
+        pool_size: int = 32,
+        keepalive_timeout: float = 60.0,
+        timeout: float = 5.0,
+        connect_timeout: float = 2.0,
+        headers: Optional[Dict[str, str]] = None,
+    ) -> None:
+        """
+        Translates through Google Translate on a pooled `aiohttp` session,
+        so that connections and their TLS handshakes are reused across
+        requests instead of being paid for each token.
+
+        The session is opened by `start` or on the first request and is
+        shared by every request of the translator until `close`.
+
+        Parameters
+        ----------
+        url: str
+            Endpoint answering like the public `translate_a/single` endpoint
+        pool_size: int
+            Connections kept open at most, which is also the concurrency limit
+        keepalive_timeout: float
+            Seconds an idle connection is kept alive for reuse
+        timeout: float
+            Seconds a request may take in total before it fails
+        connect_timeout: float
+            Seconds establishing a connection may take
+        headers: dict
+            Headers sent with every request
+        """
+        if url is not None:
+            self.url = url
+        self.pool_size = self.max_concurrency = pool_size
+        self.keepalive_timeout = keepalive_timeout
+        self.timeout = aiohttp.ClientTimeout(total=timeout, connect=connect_timeout)
+        self.headers = headers or {"User-Agent": "Mozilla/5.0"}
+        self.session: Optional[aiohttp.ClientSession] = None
+
+    async def start(self):
+        if self.session is None or self.session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.pool_size,
+                keepalive_timeout=self.keepalive_timeout,
+                ttl_dns_cache=300,
+            )
+            self.session = aiohttp.ClientSession(
+                connector=connector, timeout=self.timeout, headers=self.headers
+            )
+        return self.session
+
+    async def translate(
+        self, payload: str, dest_lang: Language, src_lang: Language
+    ) -> str:
+        session = await self.start()
+        params = {"client": "gtx", "sl": src_lang.code, "tl": dest_lang.code, "dt": "t"}
+        async with session.post(self.url, params=params, data={"q": payload}) as resp:
+            resp.raise_for_status()
+            data = await resp.json(content_type=None)
+        return "".join(segment[0] for segment in data[0] if segment[0])
+
+    async def close(self):
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+
+
+class CacheTranslator(AsyncTranslator):
+    def __init__(self, cache: Optional[Cache] = None) -> None:
+        """
+        Serves translations from a cache, defaulting to the cache of
+        `TranslationAgent`, so that it can be a tier of a `TieredTranslator`.
+        Phrases that are not cached are returned as empty strings.
+        """
+        self.cache = cache
+
+    def get_cache(self):
+        return self.cache if self.cache is not None else TranslationAgent.cache
+
+    async def translate(
+        self, payload: str, dest_lang: Language, src_lang: Language
+    ) -> str:
+        return (await self.batch_translate([payload], dest_lang, src_lang))[0]
+
+    async def batch_translate(
+        self, payloads: List[str], dest_lang: Language, src_lang: Language
+    ) -> List[str]:
+        cache = self.get_cache()
+        cache.load_cache_sync()
+        return [cached or "" for cached in cache.get_many(payloads, dest_lang)]
+
+    def remember(self, payloads: List[str], results: List[str], dest_lang: Language):
+        cache = self.get_cache()
+        for payload, result in zip(payloads, results):
+            cache.set_cache(payload, dest_lang, result)
+
+
+class Tier:
+    def __init__(
+        self,
+        translator: Union[Translator, AsyncTranslator],
+        timeout: Optional[float] = None,
+        name: Optional[str] = None,
+    ) -> None:
+        """
+        A tier of a `TieredTranslator` along with its statistics.
+
+        Parameters
+        ----------
+        translator: Translator | AsyncTranslator
+            Translator of the tier, empty results count as misses
+        timeout: float
+            Seconds the tier may take to answer a batch before every phrase
+            of it is passed on to the next tier
+        name: str
+            Name of the tier in the statistics, defaults to the name of the
+            translator class
+        """
+        self.translator = translator
+        self.backend = AsyncTranslator.wrap(translator)
+        self.timeout = timeout
+        self.name = name or type(translator).__name__
+        self.hits = self.misses = self.errors = self.timeouts = 0
+        self.batches = 0
+        self.latency = 0.0
+
+    async def batch_translate(
+        self, payloads: List[str], dest_lang: Language, src_lang: Language
+    ) -> List[str]:
+        """
+        Translates what the tier can answer, failures and timeouts are
+        counted and answered with empty strings.
+        """
+        started = monotonic()
+        translator = self.translator
+        try:
+            # Catalog lookups are in memory, they need not leave the loop
+            if isinstance(translator, CatalogTranslator) and not translator.fallback:
+                results = translator.batch_translate(payloads, dest_lang, src_lang)
+            else:
+                results = await asyncio.wait_for(
+                    self.backend.batch_translate(payloads, dest_lang, src_lang),
+                    self.timeout,
+                )
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            results = [""] * len(payloads)
+        except Exception:
+            self.errors += 1
+            results = [""] * len(payloads)
+        self.batches += 1
+        self.latency += monotonic() - started
+        hits = sum(1 for result in results if result)
+        self.hits += hits
+        self.misses += len(payloads) - hits
+        return results
+
+    def stats(self):
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "errors": self.errors,
+            "timeouts": self.timeouts,
+            "mean_latency": self.latency / self.batches if self.batches else 0.0,
+        }
+
+
+class TieredTranslator(AsyncTranslator):
+    def __init__(self, *tiers: Union[Tier, Translator, AsyncTranslator]) -> None:
+        """
+        Routes phrases through tiers of translators ordered from the cheapest
+        to the most expensive, e.g. catalogs, the cache, a local backend and
+        then a remote backend. Each tier only receives the phrases that every
+        tier before it missed, so only true misses reach the remote backend.
+        Translations found past a `CacheTranslator` tier are cached by it,
+        in which case `TranslationAgent` leaves looking phrases up in and
+        writing them to the cache to the router.
+
+        Phrases that no tier can translate are returned as empty strings,
+        which are kept untranslated and not cached by `TranslationAgent`.
+
+        E.g.
+        ```py
+        TieredTranslator(
+            CatalogTranslator("locales"),
+            Tier(CacheTranslator(), name="cache"),
+            Tier(MyLocalTranslator(), timeout=0.2),
+            Tier(RateLimitedTranslator(HttpTranslator()), timeout=2.0),
+        )
+        ```
+        """
+        self.tiers = [tier if isinstance(tier, Tier) else Tier(tier) for tier in tiers]
+
+    @property
+    def caches(self):  # type: ignore
+        return any(isinstance(tier.translator, CacheTranslator) for tier in self.tiers)
+
+    async def translate(
+        self, payload: str, dest_lang: Language, src_lang: Language
+    ) -> str:
+        return (await self.batch_translate([payload], dest_lang, src_lang))[0]
+
+    async def batch_translate(
+        self, payloads: List[str], dest_lang: Language, src_lang: Language
+    ) -> List[str]:
+        results = [""] * len(payloads)
+        pending = list(range(len(payloads)))
+        answered: List[List[int]] = []
+        for tier in self.tiers:
+            if not pending:
+                break
+            translated = await tier.batch_translate(
+                [payloads[i] for i in pending], dest_lang, src_lang
+            )
+            answered.append([])
+            missed = []
+            for i, result in zip(pending, translated):
+                if result:
+                    results[i] = result
+                    answered[-1].append(i)
+                else:
+                    missed.append(i)
+            pending = missed
+
+        for depth, tier in enumerate(self.tiers[: len(answered)]):
+            if isinstance(tier.translator, CacheTranslator):
+                found = [i for later in answered[depth + 1 :] for i in later]
+                tier.translator.remember(
+                    [payloads[i] for i in found], [results[i] for i in found], dest_lang
+                )
+        return results
+
+    def stats(self):
+        """
+        Returns the hits, misses, errors, timeouts and mean latency of every
+        tier by name.
+        """
+        return {tier.name: tier.stats() for tier in self.tiers}
+
+    async def start(self):
+        for tier in self.tiers:
+            await tier.backend.start()
+
+    async def close(self):
+        for tier in self.tiers:
+            await tier.backend.close()
@@ -1,9 +1,21 @@
+import gc
+import weakref
+
 from discord.ext.i18n.preprocess import TranslationAgent
-from discord.ext.i18n.cache import Cache
+from discord.ext.i18n.cache import (
+    Cache,
+    CompactEntry,
+    CompiledCache,
+    MessageCache,
+    ShardedCache,
+    SqliteCache,
+    compile_cache,
+)
 from discord.ext.i18n.language import Language
 from tests.utils import (
     generate_string_tuple,
     generate_rand_lang,
+    MimeCache,
     MimeTranslator,
 )
 
@@ -17,6 +29,7 @@ def test_caching():
 
     class SubMimeCache(Cache):
         def __init__(self) -> None:
+            super().__init__()
             self.internal_cache = {}
 
         async def load_cache(self):
@@ -28,6 +41,9 @@ def test_caching():
         def task(self, c):
             pass
 
+        def flush_sync(self):
+            pass
+
     for string in test_strings:
         lang = generate_rand_lang()
         agent = TranslationAgent(Language.English, lang, translator, False)
@@ -42,3 +58,291 @@ def test_caching():
                 for tk in agent.tokenize(string)
             }
         )
+
+
+async def test_journal_replay(tmp_path):
+    """
+    Test whether if journaled entries survive a reload and are folded into
+    the snapshot on compaction.
+    """
+    cache = Cache(dir=str(tmp_path))
+    await cache.empty()
+    entries = [
+        ("Hello", Language.Spanish, "Hola"),
+        ("Hello", Language.French, "Bonjour"),
+        ("Goodbye", Language.Spanish, "Adiós"),
+    ]
+    for src, lang, translated in entries:
+        cache.internal_cache.setdefault(src, {})[lang.code] = translated
+    await cache.append_journal((src, lang.code, tr) for src, lang, tr in entries)
+
+    reloaded = Cache(dir=str(tmp_path))
+    await reloaded.load_cache()
+    assert reloaded.internal_cache == cache.internal_cache
+    assert reloaded.journal_size == len(entries)
+
+    await cache.compact()
+    with open(cache.journal_pth, encoding="utf-8") as f:
+        assert f.read() == ""
+    reloaded = Cache(dir=str(tmp_path))
+    reloaded.load_cache_sync()
+    assert reloaded.internal_cache == cache.internal_cache
+    assert reloaded.journal_size == 0
+
+
+async def test_fresh_load(tmp_path):
+    """
+    Test whether if a cache loads into a folder that does not exist yet and
+    is not reloaded over its unflushed entries afterwards.
+    """
+    cache = Cache(dir=str(tmp_path / "fresh"), flush_threshold=1000)
+    await cache.load_cache()
+    assert (tmp_path / "fresh" / "cache.json").is_file()
+    cache.set_cache("Hello", Language.Spanish, "Hola")
+    cache.load_cache_sync()
+    assert cache.get_cache("Hello", Language.Spanish) == "Hola"
+    await cache.close()
+
+
+def test_cache_collected(tmp_path):
+    """
+    Test whether if caches are not kept alive by their flush at exit.
+    """
+    cache = Cache(dir=str(tmp_path))
+    ref = weakref.ref(cache)
+    del cache
+    gc.collect()
+    assert ref() is None
+
+
+async def test_coalesced_flush(tmp_path):
+    """
+    Test whether if many entries set in a burst are written out by a single
+    flusher in one append.
+    """
+    cache = Cache(dir=str(tmp_path), flush_interval=0.01, flush_threshold=1000)
+    await cache.empty()
+    writes = []
+    append_journal = cache.append_journal
+
+    async def counting_append(entries):
+        writes.append(list(entries))
+        await append_journal(writes[-1])
+
+    cache.append_journal = counting_append
+    for i in range(100):
+        cache.set_cache(f"phrase {i}", Language.Spanish, f"frase {i}")
+    await cache.close()
+    assert len(writes) == 1 and len(writes[0]) == 100
+
+    reloaded = Cache(dir=str(tmp_path))
+    await reloaded.load_cache()
+    assert reloaded.internal_cache == cache.internal_cache
+
+
+async def test_sqlite_cache(tmp_path):
+    """
+    Test whether if the sqlite backend persists batched entries and serves
+    them back through the same surface as `Cache`, also before they are
+    flushed.
+    """
+    cache = SqliteCache(dir=str(tmp_path), hot_size=2, flush_threshold=1000)
+    await cache.load_cache()
+    for i in range(10):
+        cache.set_cache(f"phrase {i}", Language.Spanish, f"frase {i}")
+    cache.set_cache("phrase 0", Language.French, "phrase zéro")
+    # More entries than `hot_size` are set before the flush
+    for i in range(10):
+        assert cache.get_cache(f"phrase {i}", Language.Spanish) == f"frase {i}"
+    await cache.close()
+    assert len(cache.hot) == 2
+    assert cache.pending == {}
+
+    reloaded = SqliteCache(dir=str(tmp_path))
+    await reloaded.load_cache()
+    for i in range(10):
+        assert reloaded.get_cache(f"phrase {i}", Language.Spanish) == f"frase {i}"
+    assert reloaded.get_cache("phrase 0", Language.French) == "phrase zéro"
+    assert reloaded.get_cache("phrase 0", Language.German) is None
+
+    await reloaded.empty()
+    assert reloaded.get_cache("phrase 1", Language.Spanish) is None
+
+
+async def test_bounded_eviction(tmp_path):
+    """
+    Test whether if a bounded cache evicts the least recently used phrases
+    and drops them from the persisted cache as well.
+    """
+    cache = Cache(dir=str(tmp_path), max_entries=3)
+    await cache.empty()
+    for i in range(3):
+        cache.set_cache(f"phrase {i}", Language.Spanish, f"frase {i}")
+    assert cache.get_cache("phrase 0", Language.Spanish) == "frase 0"
+    cache.set_cache("phrase 3", Language.Spanish, "frase 3")
+
+    assert cache.evictions == 1
+    assert list(cache.internal_cache) == ["phrase 2", "phrase 0", "phrase 3"]
+    await cache.close()
+
+    reloaded = Cache(dir=str(tmp_path))
+    await reloaded.load_cache()
+    assert reloaded.internal_cache == cache.internal_cache
+
+    budget = Cache(dir=str(tmp_path), max_bytes=40, policy="lfu")
+    await budget.load_cache()
+    assert budget.size <= 40 and budget.evictions == 1
+
+
+async def test_compiled_cache(tmp_path):
+    """
+    Test whether if a compiled snapshot answers the same lookups as the
+    cache it was compiled from, with new entries landing in the overlay.
+    """
+    entries = {
+        f"phrase {i}": {"es": f"frase {i}", "fr": f"phrase {i} ✓"} for i in range(50)
+    }
+    compile_cache(entries, str(tmp_path / "cache.bin"))
+
+    cache = CompiledCache(dir=str(tmp_path))
+    await cache.load_cache()
+    for src, translations in entries.items():
+        assert cache.get_cache(src, Language.Spanish) == translations["es"]
+        assert cache.get_cache(src, Language.French) == translations["fr"]
+    assert cache.get_cache("phrase 50", Language.Spanish) is None
+    assert cache.get_cache("phrase 0", Language.German) is None
+
+    cache.set_cache("phrase 50", Language.Spanish, "frase 50")
+    assert cache.get_cache("phrase 50", Language.Spanish) == "frase 50"
+    await cache.recompile()
+    assert cache.overlay.internal_cache == {}
+    assert cache.count == 101
+    assert cache.get_cache("phrase 50", Language.Spanish) == "frase 50"
+    await cache.close()
+    cache.close_snapshot()
+
+
+async def test_journal_without_snapshot(tmp_path):
+    """
+    Test whether if entries that were only journaled survive a reload, as
+    is the case until the first compaction writes the snapshot.
+    """
+    cache = Cache(dir=str(tmp_path / "plain"))
+    cache.load_cache_sync()
+    cache.set_cache("Hello", Language.Spanish, "Hola")
+    await cache.close()
+    (tmp_path / "plain" / "cache.json").unlink()
+    reloaded = Cache(dir=str(tmp_path / "plain"))
+    await reloaded.load_cache()
+    assert reloaded.get_cache("Hello", Language.Spanish) == "Hola"
+
+    cache = CompiledCache(dir=str(tmp_path / "compiled"))
+    await cache.load_cache()
+    cache.set_cache("Hello", Language.Spanish, "Hola")
+    await cache.close()
+    reloaded = CompiledCache(dir=str(tmp_path / "compiled"))
+    await reloaded.load_cache()
+    assert reloaded.get_cache("Hello", Language.Spanish) == "Hola"
+    reloaded.close_snapshot()
+
+
+async def test_sharded_cache(tmp_path):
+    """
+    Test whether if each language is persisted to and lazily loaded from its
+    own shard.
+    """
+    cache = ShardedCache(dir=str(tmp_path))
+    await cache.load_cache()
+    cache.set_cache("Hello", Language.Spanish, "Hola")
+    cache.set_cache("Hello", Language.French, "Bonjour")
+    await cache.close()
+    assert (tmp_path / "es.journal").is_file()
+    assert (tmp_path / "fr.journal").is_file()
+
+    reloaded = ShardedCache(dir=str(tmp_path))
+    await reloaded.load_cache()
+    assert reloaded.shards == {}
+    assert reloaded.get_cache("Hello", Language.Spanish) == "Hola"
+    assert list(reloaded.shards) == ["es"]
+    assert reloaded.shards["es"].internal_cache == {"Hello": {"es": "Hola"}}
+
+    await reloaded.empty()
+    assert reloaded.get_cache("Hello", Language.French) is None
+
+
+def test_message_cache():
+    """
+    Test whether if repeated strings are served from the message cache
+    without reaching the phrase cache again.
+    """
+    translator = MimeTranslator()
+    agent = TranslationAgent(Language.English, Language.Spanish, translator, False)
+    agent.cache = MimeCache()
+    agent.message_cache = MessageCache(max_entries=2)
+    agent.enable_cache = True
+
+    assert agent.translate("Hello **there**") == "Hello **there**"
+    agent.cache.cache_obj.clear()
+    assert agent.translate("Hello **there**") == "Hello **there**"
+    assert agent.cache.cache_obj == {}
+
+    agent.translate("Second")
+    agent.translate("Third")
+    assert agent.message_cache.get(
+        "Hello **there**", Language.English, Language.Spanish
+    ) is None
+
+
+async def test_compact_entries(tmp_path):
+    """
+    Test whether if compact entries behave like the dicts they replace,
+    including across a compaction and reload.
+    """
+    entry = CompactEntry({"fr": "Bonjour", "es": "Hola"})
+    entry["de"] = "Hallo"
+    entry["es"] = "¡Hola!"
+    assert entry.lookup(Language.Spanish) == "¡Hola!"
+    assert entry.lookup(Language.Japanese) is None
+    assert entry == {"es": "¡Hola!", "fr": "Bonjour", "de": "Hallo"}
+    assert list(entry) == sorted(entry, key=lambda c: Language.from_code(c).ordinal)
+    del entry["fr"]
+    assert "fr" not in entry and len(entry) == 2
+
+    cache = Cache(dir=str(tmp_path), compact_entries=True)
+    await cache.empty()
+    cache.set_cache("Hello", Language.Spanish, "Hola")
+    cache.set_cache("Hello", Language.German, "Hallo")
+    assert isinstance(cache.internal_cache["Hello"], CompactEntry)
+    assert cache.get_cache("Hello", Language.German) == "Hallo"
+    await cache.save_cache()
+
+    reloaded = Cache(dir=str(tmp_path), compact_entries=True)
+    await reloaded.load_cache()
+    assert reloaded.internal_cache == {"Hello": {"es": "Hola", "de": "Hallo"}}
+
+
+async def test_hashed_keys(tmp_path):
+    """
+    Test whether if hashed keys are fixed width, survive a reload and treat
+    checksum mismatches as misses.
+    """
+    phrase = "A long embed description " * 100
+    cache = Cache(dir=str(tmp_path), hash_keys=True, verify_keys=True)
+    await cache.empty()
+    cache.set_cache(phrase, Language.Spanish, "Una descripción")
+    assert cache.get_cache(phrase, Language.Spanish) == "Una descripción"
+    assert cache.get_cache("Another phrase", Language.Spanish) is None
+    (key,) = cache.internal_cache
+    assert len(key) == 2 * cache.digest_size
+    await cache.close()
+
+    reloaded = Cache(dir=str(tmp_path), hash_keys=True, verify_keys=True)
+    await reloaded.load_cache()
+    assert reloaded.get_cache(phrase, Language.Spanish) == "Una descripción"
+
+    # Simulate another phrase colliding with the same digest
+    reloaded.internal_cache[key]["#"] = "00000000"
+    assert reloaded.get_cache(phrase, Language.Spanish) is None
+    reloaded.set_cache(phrase, Language.French, "Une description")
+    assert reloaded.internal_cache[key].get("es") is None
+    assert reloaded.get_cache(phrase, Language.French) == "Une description"
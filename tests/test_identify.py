@@ -0,0 +1,113 @@
+from unittest.mock import Mock
+from discord.ext.i18n.cache import MessageCache
+from discord.ext.i18n.identify import LanguageIdentifier, script_of
+from discord.ext.i18n.language import Language
+from discord.ext.i18n.preprocess import TranslationAgent
+
+identifier = LanguageIdentifier()
+
+
+def test_script_of():
+    assert script_of("a") == "Latin"
+    assert script_of("ж") == "Cyrillic"
+    assert script_of("한") == "Hangul"
+    assert script_of("1") is None
+    assert script_of("!") is None
+
+
+def test_identify_script():
+    """
+    Test whether if languages with a script of their own are identified by
+    their script and scripts shared without a profile are not.
+    """
+    assert identifier.identify("안녕하세요") is Language.Korean
+    assert identifier.identify("こんにちは世界") is Language.Japanese
+    assert identifier.identify("你好世界") is None
+    assert identifier.identify("שלום עולם") is None
+    assert identifier.identify("Γεια σου κόσμε") is Language.Greek
+    assert identifier.identify("สวัสดีครับ") is Language.Thai
+    assert identifier.identify("<@1234> 12:30 !!") is None
+
+
+def test_identify_ngrams():
+    """
+    Test whether if languages sharing a script are told apart and short
+    texts are left unidentified.
+    """
+    for text, lang in {
+        "Hello there, how are you doing today?": Language.English,
+        "Welcome to the server, please read the rules": Language.English,
+        "Merci d'avoir voté pour le sondage": Language.French,
+        "Gracias por votar en la encuesta": Language.Spanish,
+        "Der Server wird in fünf Minuten neu gestartet": Language.German,
+        "Ciao a tutti, come state oggi?": Language.Italian,
+        "Привіт усім, як у вас справи сьогодні?": Language.Ukrainian,
+    }.items():
+        assert identifier.identify(text) is lang, text
+    assert identifier.identify("ok") is None
+
+
+def test_identify_long():
+    """
+    Test whether if long texts are identified from their start.
+    """
+    text = "Gracias por votar en la encuesta y bienvenidos al servidor. " * 80
+    assert identifier.identify(text) is Language.Spanish
+    assert identifier.classify(text + "Hello there, how are you?" * 80) is (
+        Language.Spanish
+    )
+
+
+def test_identify_cached():
+    cached = LanguageIdentifier(max_entries=2)
+    for text in ("Hello there, how are you doing today?", "안녕", "你好"):
+        cached.identify(text)
+    assert list(cached.entries) == ["안녕", "你好"]
+
+
+def test_encode_lang_str():
+    """
+    Test whether if strings already in the destination language are not
+    marked for translation.
+    """
+    text = "Hello there, how are you doing today?"
+    assert (
+        TranslationAgent.encode_lang_str(Language.French, text, Language.English)
+        == text
+    )
+    assert (
+        TranslationAgent.encode_lang_str(Language.English, text, Language.French)
+        == f"{text}{TranslationAgent.delim}fr"
+    )
+    # Han is written in both Simplified and Traditional Chinese
+    text = "歡迎來到伺服器"
+    assert (
+        TranslationAgent.encode_lang_str(
+            Language.ChineseTraditional, text, Language.ChineseSimplified
+        )
+        == f"{text}{TranslationAgent.delim}zh-cn"
+    )
+
+
+def test_encode_lang_str_decisions(monkeypatch):
+    """
+    Test whether if decisions and translations of the message cache skip
+    language identification.
+    """
+    cache = MessageCache()
+    monkeypatch.setattr(TranslationAgent, "message_cache", cache)
+    monkeypatch.setattr(TranslationAgent, "identifier", Mock(wraps=identifier))
+
+    text = "Hello there, how are you doing today?"
+    for _ in range(2):
+        TranslationAgent.encode_lang_str(Language.English, text, Language.French)
+    assert TranslationAgent.identifier.identify.call_count == 1
+
+    cache.set("Hi", Language.English, Language.French, "Salut")
+    assert TranslationAgent.encode_lang_str(
+        Language.English, "Salut", Language.French
+    ) == "Salut"
+    assert TranslationAgent.encode_lang_str(
+        Language.English, "Hi", Language.French
+    ) == f"Hi{TranslationAgent.delim}fr"
+    assert TranslationAgent.identifier.identify.call_count == 1
@@ -89,3 +89,12 @@ def test_enum_complete():
         v_enum_codes.add(code[0])
 
     assert v_name2codes == v_enum_codes
+
+
+def test_ordinal():
+    """
+    Test whether if every language has a distinct ordinal matching its
+    position in the enum.
+    """
+    for i, sub in enumerate(Language._value2member_map_.values()):
+        assert sub.ordinal == i
@@ -1,10 +1,28 @@
+import time
+import asyncio
+import pytest
+import threading
+
+from array import array
+from random import choice, randint
 from unittest.mock import Mock
+from weakref import WeakKeyDictionary
+from discord.ext.i18n.cache import MessageCache
 from discord.ext.i18n.language import Language
 from discord.ext.i18n.preprocess import (
+    AsyncTranslator,
+    Decoratives,
+    ThreadedTranslator,
     TranslationAgent,
     Translator,
 )
-from utils import generate_string_tuple, MimeTranslator
+from utils import (
+    generate_string_tuple,
+    FailingTranslator,
+    MimeCache,
+    MimeTranslator,
+    UpperTranslator,
+)
 
 
 # Test on string "```py\ndiscord-ext-i18n```"
@@ -65,3 +83,442 @@ def test_tokenize_phrases():
     agent.cache = Mock()
     for src, tokenls in test_map.items():
         assert [a["phrase"] for a in agent.tokenize(src)] == tokenls
+
+
+async def test_async_translation():
+    """
+    Test whether if blocking translators run through the thread pool adapter
+    assemble the same strings as the synchronous path.
+    """
+    test_strings = generate_string_tuple(30, 10, 50)
+    mime = MimeTranslator()
+    agent = TranslationAgent(Language.English, Language.Swahili, mime, False)
+    assert isinstance(agent.async_translator, ThreadedTranslator)
+    assert AsyncTranslator.wrap(mime) is agent.async_translator
+    for string in test_strings:
+        assert await agent.translate_async(string) == agent.translate(string)
+
+
+async def test_failed_translation():
+    """
+    Test whether if phrases that fail to translate are kept as they are and
+    are not cached.
+    """
+    agent = TranslationAgent(
+        Language.English, Language.Swahili, FailingTranslator(), False
+    )
+    agent.cache = MimeCache()
+    agent.enable_cache = True
+    assert await agent.trans_assemble_async(
+        "Hello **there**", agent.tokenize("Hello **there**")
+    ) == "Hello **there**"
+    assert agent.cache.cache_obj == {}
+
+
+def test_sync_async_translator(monkeypatch):
+    """
+    Test whether if translating synchronously with an asynchronous translator
+    raises a clear error.
+    """
+    monkeypatch.setattr(TranslationAgent, "cache", MimeCache())
+    monkeypatch.setattr(TranslationAgent, "message_cache", MessageCache())
+    agent = TranslationAgent(Language.English, Language.Swahili, UpperTranslator())
+    with pytest.raises(TypeError, match="translate_async"):
+        agent.translate("Hello **there**")
+
+
+async def test_failed_message_not_cached(monkeypatch):
+    """
+    Test whether if messages that failed to translate are translated again
+    once the translator recovers.
+    """
+    monkeypatch.setattr(TranslationAgent, "cache", MimeCache())
+    monkeypatch.setattr(TranslationAgent, "message_cache", MessageCache())
+    agent = TranslationAgent(Language.English, Language.Swahili, FailingTranslator())
+    assert await agent.translate_async("Hello **there**") == "Hello **there**"
+    agent.translator = agent.async_translator = UpperTranslator()
+    assert await agent.translate_async("Hello **there**") == "HELLO **THERE**"
+
+
+async def test_translate_payload(monkeypatch):
+    """
+    Test whether if every enabled field of a payload is translated.
+    """
+    monkeypatch.setattr(TranslationAgent, "cache", MimeCache())
+    monkeypatch.setattr(TranslationAgent, "message_cache", MessageCache())
+    payload = {
+        "embed": {
+            "title": "Title",
+            "description": "Some **description**",
+            "fields": [{"name": "Name", "value": "Value"}],
+            "footer": {"text": "Footer"},
+        },
+        "components": [
+            {
+                "components": [
+                    {"type": 2, "label": "Yes"},
+                    {"type": 3, "options": [{"label": "No"}]},
+                ]
+            }
+        ],
+    }
+    flags = {
+        f"translate_{x}": True
+        for x in ("messages", "embeds", "buttons", "selects", "modals", "components")
+    }
+    payload, content = await TranslationAgent.translate_payload(
+        Language.French,
+        payload,
+        "Hello there",
+        source_lang=Language.English,
+        translator=UpperTranslator(),
+        **flags,
+    )
+    assert content == "HELLO THERE"
+    assert payload["embed"] == {
+        "title": "TITLE",
+        "description": "SOME **DESCRIPTION**",
+        "fields": [{"name": "NAME", "value": "VALUE"}],
+        "footer": {"text": "FOOTER"},
+    }
+    assert payload["components"][0]["components"][0]["label"] == "YES"
+    assert payload["components"][0]["components"][1]["options"][0]["label"] == "NO"
+
+
+def test_batch_translate():
+    """
+    Test whether if batches are packed into one request and retried one
+    payload at a time when the packed result cannot be split back apart.
+    """
+
+    class CountingTranslator(Translator):
+        pack_requests = True
+
+        def __init__(self, mangle=False) -> None:
+            self.calls = 0
+            self.mangle = mangle
+
+        def translate(self, payload, dest_lang, src_lang):
+            self.calls += 1
+            if self.mangle:
+                payload = payload.replace(self.batch_separator.strip(), "")
+            return payload.upper()
+
+    payloads = [f"segment number {i}" for i in range(15)]
+    translator = CountingTranslator()
+    assert translator.batch_translate(
+        payloads, Language.French, Language.English
+    ) == [p.upper() for p in payloads]
+    assert translator.calls == 1
+
+    translator.batch_limit = 100
+    translator.batch_translate(payloads, Language.French, Language.English)
+    assert translator.calls == 1 + 3
+
+    translator = CountingTranslator(mangle=True)
+    assert translator.batch_translate(
+        payloads, Language.French, Language.English
+    ) == [p.upper() for p in payloads]
+    assert translator.calls == 1 + len(payloads)
+
+
+async def test_overridden_translate_unpacked(monkeypatch):
+    """
+    Test whether if translators overriding `translate` receive every segment
+    on its own unless they opt into packing.
+    """
+    monkeypatch.setattr(TranslationAgent, "cache", MimeCache())
+    monkeypatch.setattr(TranslationAgent, "message_cache", MessageCache())
+
+    class DictTranslator(Translator):
+        def translate(self, payload, dest_lang, src_lang):
+            return {"Hello": "Hola", "World": "Mundo"}.get(payload, payload)
+
+    translator = DictTranslator()
+    assert translator.batch_translate(
+        ["Hello", "World"], Language.Spanish, Language.English
+    ) == ["Hola", "Mundo"]
+    agent = TranslationAgent(Language.English, Language.Spanish, translator)
+    assert agent.translate("Hello **World**") == "Hola **Mundo**"
+    agent.message_cache.clear()
+    assert await agent.translate_async("Hello **World**") == "Hola **Mundo**"
+
+
+async def test_single_batch_per_message():
+    """
+    Test whether if all the cache-missing tokens of a message are translated
+    in a single batch.
+    """
+
+    class BatchCountingTranslator(UpperTranslator):
+        async def batch_translate(self, payloads, dest_lang, src_lang):
+            self.calls.append(list(payloads))
+            return [p.upper() for p in payloads]
+
+    translator = BatchCountingTranslator()
+    agent = TranslationAgent(Language.English, Language.French, translator, False)
+    content = "What **is** your *name*? **is** it `code`"
+    assert await agent.translate_async(content) == content.upper()
+    assert translator.calls == [["What", "is", "your", "name", "it", "code"]]
+
+
+async def test_single_batch_per_payload(monkeypatch):
+    """
+    Test whether if the tokens of every field of a payload are deduplicated
+    and translated in a single batch.
+    """
+    monkeypatch.setattr(TranslationAgent, "cache", MimeCache())
+    monkeypatch.setattr(TranslationAgent, "message_cache", MessageCache())
+
+    class BatchCountingTranslator(UpperTranslator):
+        async def batch_translate(self, payloads, dest_lang, src_lang):
+            self.calls.append(list(payloads))
+            return [p.upper() for p in payloads]
+
+    translator = BatchCountingTranslator()
+    payload = {
+        "embed": {
+            "title": "Poll",
+            "fields": [
+                {"name": "Yes", "value": "**Yes**"},
+                {"name": "No", "value": "No"},
+            ],
+        },
+        "components": [
+            {
+                "components": [
+                    {"type": 3, "options": [{"label": "Yes"}, {"label": "No"}]},
+                ]
+            }
+        ],
+    }
+    flags = {
+        f"translate_{x}": True
+        for x in ("messages", "embeds", "buttons", "selects", "modals", "components")
+    }
+    payload, content = await TranslationAgent.translate_payload(
+        Language.German,
+        payload,
+        "Vote on the **Poll**",
+        source_lang=Language.English,
+        translator=translator,
+        **flags,
+    )
+    assert content == "VOTE ON THE **POLL**"
+    assert payload["embed"]["fields"][0] == {"name": "YES", "value": "**YES**"}
+    assert payload["components"][0]["components"][0]["options"][1]["label"] == "NO"
+    assert translator.calls == [["Vote on the", "Poll", "Yes", "No"]]
+
+
+async def test_single_flight():
+    """
+    Test whether if concurrent translations of the same phrase share a
+    single backend request.
+    """
+
+    class SlowTranslator(UpperTranslator):
+        async def translate(self, payload, dest_lang, src_lang):
+            await asyncio.sleep(0.01)
+            return await super().translate(payload, dest_lang, src_lang)
+
+    translator = SlowTranslator()
+    agents = [
+        TranslationAgent(Language.English, Language.Danish, translator, False)
+        for _ in range(10)
+    ]
+    results = await asyncio.gather(
+        *(agent.translate_async("Big announcement") for agent in agents)
+    )
+    assert results == ["BIG ANNOUNCEMENT"] * 10
+    assert translator.calls == ["Big announcement"]
+    assert TranslationAgent.inflight == {}
+
+
+async def test_bounded_concurrency():
+    """
+    Test whether if batches are translated concurrently within the
+    concurrency limit of the translator and keep their order.
+    """
+
+    class TrackingTranslator(AsyncTranslator):
+        max_concurrency = 2
+
+        def __init__(self) -> None:
+            self.active = self.peak = 0
+
+        async def translate(self, payload, dest_lang, src_lang):
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+            await asyncio.sleep(0.01)
+            self.active -= 1
+            return payload.upper()
+
+    translator = TrackingTranslator()
+    payloads = [f"segment {i}" for i in range(6)]
+    assert await translator.batch_translate(
+        payloads, Language.Korean, Language.English
+    ) == [p.upper() for p in payloads]
+    assert translator.peak == 2
+
+
+async def test_threaded_process_concurrency(monkeypatch):
+    """
+    Test whether if blocking translators only start a call in their thread
+    pool once the process wide limit allows it.
+    """
+    monkeypatch.setattr(AsyncTranslator, "process_concurrency", 1)
+    monkeypatch.setattr(AsyncTranslator, "process_slots", WeakKeyDictionary())
+
+    class BlockingTranslator(Translator):
+        def __init__(self) -> None:
+            self.lock = threading.Lock()
+            self.active = self.peak = 0
+
+        def translate(self, payload, dest_lang, src_lang):
+            with self.lock:
+                self.active += 1
+                self.peak = max(self.peak, self.active)
+            time.sleep(0.005)
+            with self.lock:
+                self.active -= 1
+            return payload.upper()
+
+    translator = BlockingTranslator()
+    threaded = ThreadedTranslator(translator, max_workers=4)
+    payloads = [f"segment {i}" for i in range(8)]
+    assert await threaded.batch_translate(
+        payloads, Language.Korean, Language.English
+    ) == [p.upper() for p in payloads]
+    assert translator.peak == 1
+    await threaded.close()
+
+
+def legacy_match(string: str, i: int):
+    """
+    The scan over `similar_decors` that `match_decor` replaced.
+    """
+    char = tmp_char = string[i]
+    tmp_pos = i
+    string_len = len(string)
+    sample = TranslationAgent.similar_decors(char)
+    while sample and i + 1 != string_len:
+        i += 1
+        char += string[i]
+        sample = TranslationAgent.similar_decors(char)
+    if i + 1 != string_len:
+        char = char[:-1]
+        i -= 1
+    if char not in TranslationAgent.decoratives:
+        char = tmp_char
+        i = tmp_pos
+    return char, i
+
+
+def test_match_decor():
+    """
+    Test whether if the decorative trie matches exactly what the scan over
+    `similar_decors` did, including at the end of strings.
+    """
+    cases = ["a**b", "a**", "**", "```py\nx```", "```pz", "```py", "<@1>", "<@"]
+    alphabet = "*`_<@#&!:()>\u200b\npyjs a"
+    for _ in range(300):
+        cases.append("".join(choice(alphabet) for _ in range(randint(1, 12))))
+    for string in cases:
+        for i in range(len(string)):
+            assert TranslationAgent.match_decor(string, i) == legacy_match(
+                string, i
+            ), (string, i)
+
+
+def test_decoratives_recompiled(monkeypatch):
+    """
+    Test whether if decoratives added or edited later are matched.
+    """
+    monkeypatch.setattr(
+        TranslationAgent,
+        "decoratives",
+        Decoratives({**TranslationAgent.decoratives, "~~": "~~"}),
+    )
+    assert TranslationAgent.match_decor("a ~~b~~", 2) == ("~~", 3)
+    assert [tk["phrase"] for tk in TranslationAgent.tokenize("a ~~b~~")] == ["a", "b"]
+    TranslationAgent.decoratives["~~"] = "="
+    phrases = ["a", "b", "c"]
+    assert [tk["phrase"] for tk in TranslationAgent.tokenize("a ~~b= c")] == phrases
+
+    plain = {**TranslationAgent.decoratives, "~~": "~~"}
+    monkeypatch.setattr(TranslationAgent, "decoratives", plain)
+    TranslationAgent.tokenize("a ~~b~~")
+    plain["~~"] = "="
+    TranslationAgent.recompile()
+    assert [tk["phrase"] for tk in TranslationAgent.tokenize("a ~~b= c")] == phrases
+
+
+def test_scan_matches_legacy():
+    """
+    Test whether if the compiled scanner produces the same tokens as the
+    original tokenizer loop.
+    """
+    corpus = [
+        "Hello **there**, _general_ `Kenobi`!",
+        "<@1234> said: (quietly) ```py\nprint('hi')\n``` right?",
+        "Mixed 日本語 and <:emoji:1234> with \u200bno translate\u200b text.",
+        "?? leading questions ... trailing dots... ",
+        "**unterminated *bold _and `code",
+        "",
+        "   ",
+    ]
+    alphabet = "ab Z?!.,*`_<>@#&:()\u200b\nあé-"
+    for _ in range(2000):
+        corpus.append("".join(choice(alphabet) for _ in range(randint(1, 24))))
+    for string in corpus:
+        legacy = [
+            (tk["start_pos"], tk["end_pos"], tk["phrase"])
+            for tk in TranslationAgent.legacy_tokenize(string)
+        ]
+        assert TranslationAgent.scan(string) == legacy, string
+
+
+def test_legacy_tokenizer_flag(monkeypatch):
+    monkeypatch.setattr(TranslationAgent, "legacy_tokenizer", True)
+    tokens = TranslationAgent.tokenize("Hello **there**")
+    assert tokens == [(0, 5, "Hello"), (8, 13, "there")]
+    assert tokens[1]["phrase"] == tokens[1].phrase == "there"
+
+
+def legacy_assemble(payload: str, tokens, translations):
+    """
+    The per character splicing that `assemble` replaced.
+    """
+    new_str = list(payload)
+    mitigate = 0
+    for tk, phrase in zip(tokens, translations):
+        new_str[tk["start_pos"] + mitigate : tk["end_pos"] + mitigate] = phrase
+        if tk["end_pos"] - tk["start_pos"] != len(phrase):
+            mitigate += len(phrase) - (tk["end_pos"] - tk["start_pos"])
+    return "".join(new_str)
+
+
+def test_assemble():
+    """
+    Test whether if assembling matches splicing for every form of tokens.
+    """
+    for string in generate_string_tuple(200, 0, 200):
+        tokens = TranslationAgent.tokenize(string)
+        translations = [generate_string_tuple(1, 0, 12)[0] for _ in tokens]
+        expected = legacy_assemble(string, tokens, translations)
+        assert TranslationAgent.assemble(string, tokens, translations) == expected
+        assert (
+            TranslationAgent.assemble(
+                string, [tk._asdict() for tk in tokens], translations
+            )
+            == expected
+        )
+        assert (
+            TranslationAgent.assemble_spans(
+                string,
+                array("I", (tk.start_pos for tk in tokens)),
+                array("I", (tk.end_pos for tk in tokens)),
+                translations,
+            )
+            == expected
+        )
@@ -0,0 +1,65 @@
+import asyncio
+
+from time import monotonic
+from discord.ext.i18n.cache import Cache
+from discord.ext.i18n.language import Language
+from discord.ext.i18n.remote import CacheServer, RemoteCache
+
+
+async def test_shared_cache(tmp_path):
+    """
+    Test whether if entries set by one remote cache are served to another
+    through the same cache server.
+    """
+    socket_path = str(tmp_path / "cache.sock")
+    server = CacheServer(socket_path, Cache(dir=str(tmp_path))).start()
+    try:
+        first, second = RemoteCache(socket_path), RemoteCache(socket_path)
+        await first.load_cache()
+        await second.load_cache()
+
+        first.set_cache("Hello", Language.Spanish, "Hola")
+        first.set_cache("Goodbye", Language.Spanish, "Adiós")
+        assert first.get_cache("Hello", Language.Spanish) == "Hola"
+        assert second.get_cache("Hello", Language.Spanish) is None
+
+        await first.close()
+        assert second.get_many(
+            ["Hello", "Goodbye", "Thanks"], Language.Spanish
+        ) == ["Hola", "Adiós", None]
+        assert server.cache.internal_cache["Hello"] == {"es": "Hola"}
+
+        await second.empty()
+        assert second.get_cache("Hello", Language.Spanish) is None
+        await second.close()
+    finally:
+        server.stop()
+
+
+async def test_unreachable_server(tmp_path):
+    """
+    Test whether if lookups miss while the server is down without retrying
+    it on every lookup, and held back entries are sent once it is reachable
+    again.
+    """
+    socket_path = str(tmp_path / "cache.sock")
+    cache = RemoteCache(socket_path, flush_threshold=1000, retry_interval=0.05)
+    await cache.load_cache()
+    cache.set_cache("Hello", Language.Spanish, "Hola")
+    await cache.flush()
+    assert cache.get_many(["Hello", "Thanks"], Language.Spanish) == ["Hola", None]
+    assert cache.retry_at > monotonic()
+
+    server = CacheServer(socket_path, Cache(dir=str(tmp_path))).start()
+    try:
+        assert cache.get_cache("Thanks", Language.Spanish) is None
+        assert cache.reader.stream is None
+        await cache.close()
+        assert server.cache.internal_cache["Hello"] == {"es": "Hola"}
+        assert cache.pending == {}
+
+        await asyncio.sleep(0.05)
+        assert cache.get_cache("Hello", Language.Spanish) == "Hola"
+        await cache.close()
+    finally:
+        server.stop()
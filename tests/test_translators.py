@@ -0,0 +1,351 @@
+import asyncio
+import pytest
+
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from time import monotonic
+
+from discord.ext.i18n.cache import MessageCache
+from discord.ext.i18n.language import Language
+from discord.ext.i18n.preprocess import AsyncTranslator, TranslationAgent
+from discord.ext.i18n.translators import (
+    CacheTranslator,
+    CatalogTranslator,
+    CircuitBreaker,
+    CircuitOpenError,
+    HttpTranslator,
+    RateLimitedTranslator,
+    Tier,
+    TieredTranslator,
+    TokenBucket,
+)
+from utils import (
+    FailingTranslator,
+    MimeCache,
+    MimeTranslator,
+    UpperTranslator,
+    write_mo,
+)
+
+
+async def raise_connection_error():
+    raise ConnectionError("503 Service Unavailable")
+
+
+class FlakyTranslator(AsyncTranslator):
+    def __init__(self, failures: int) -> None:
+        self.failures = failures
+        self.calls = 0
+
+    async def translate(self, payload: str, dest_lang, src_lang):
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise ConnectionError("429 Too Many Requests")
+        return payload.upper()
+
+
+async def test_token_bucket():
+    """
+    Test whether if the bucket admits a burst at once and the rest at its
+    rate.
+    """
+    bucket = TokenBucket(rate=50, burst=2)
+    started = monotonic()
+    for _ in range(4):
+        await bucket.acquire()
+    assert 0.03 <= monotonic() - started < 0.5
+
+
+async def test_rate_limited_retries():
+    """
+    Test whether if failed requests are retried after backing off and the
+    limits are cut multiplicatively.
+    """
+    backend = FlakyTranslator(failures=2)
+    translator = RateLimitedTranslator(backend, rate=100, backoff=0.001)
+    assert (
+        await translator.translate("hello", Language.Korean, Language.English)
+        == "HELLO"
+    )
+    assert backend.calls == 3
+    # Halved twice, then grown by one over the limit on success
+    assert translator.limit == 2.5
+    assert translator.bucket.rate < 100
+
+
+async def test_rate_limited_gives_up():
+    """
+    Test whether if a request that keeps failing is raised after its
+    retries.
+    """
+    translator = RateLimitedTranslator(
+        FailingTranslator(), retries=1, backoff=0.001, min_concurrency=2
+    )
+    with pytest.raises(ConnectionError):
+        await translator.translate("hello", Language.Korean, Language.English)
+    assert translator.limit == 2
+
+
+async def test_rate_limited_recovers():
+    """
+    Test whether if the concurrency limit grows back additively on fast
+    successes.
+    """
+    translator = RateLimitedTranslator(UpperTranslator(), rate=1000)
+    translator.limit = 1.0
+    payloads = [f"line {i}" for i in range(10)]
+    assert await translator.batch_translate(
+        payloads, Language.Korean, Language.English
+    ) == [p.upper() for p in payloads]
+    assert 1.0 < translator.limit <= translator.max_concurrency
+
+
+async def test_rate_limited_cancelled():
+    """
+    Test whether if requests cancelled while waiting on the bucket give their
+    concurrency slot back.
+    """
+    translator = RateLimitedTranslator(UpperTranslator(), rate=1, burst=1)
+    await translator.bucket.acquire()
+    for _ in range(translator.max_concurrency + 1):
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(
+                translator.translate("hello", Language.Korean, Language.English),
+                0.01,
+            )
+    assert translator.active == 0
+
+
+def test_unknown_option():
+    with pytest.raises(TypeError):
+        RateLimitedTranslator(UpperTranslator(), ratee=1)
+
+
+async def test_circuit_breaker():
+    """
+    Test whether if the circuit opens after consecutive failures, skips the
+    backend while open and closes again after a successful probe.
+    """
+    backend = FlakyTranslator(failures=2)
+    breaker = CircuitBreaker(backend, failure_threshold=2, reset_timeout=0.05)
+    for _ in range(2):
+        with pytest.raises(ConnectionError):
+            await breaker.translate("hello", Language.Korean, Language.English)
+    assert breaker.state == "open"
+    with pytest.raises(CircuitOpenError):
+        await breaker.translate("hello", Language.Korean, Language.English)
+    assert backend.calls == 2
+
+    await asyncio.sleep(0.05)
+    assert breaker.state == "half-open"
+    assert (
+        await breaker.translate("hello", Language.Korean, Language.English)
+        == "HELLO"
+    )
+    assert breaker.state == "closed"
+
+
+async def test_circuit_breaker_stale_call():
+    """
+    Test whether if a call sent before the circuit opened neither clears an
+    in-flight probe nor closes the circuit.
+    """
+    loop = asyncio.get_running_loop()
+    stale, probe = loop.create_future(), loop.create_future()
+    breaker = CircuitBreaker(UpperTranslator(), failure_threshold=1, reset_timeout=0)
+    slow = asyncio.ensure_future(breaker.call(lambda: stale))
+    await asyncio.sleep(0)
+    with pytest.raises(ConnectionError):
+        await breaker.call(raise_connection_error)
+    probing = asyncio.ensure_future(breaker.call(lambda: probe))
+    await asyncio.sleep(0)
+    assert breaker.probing
+
+    stale.set_result("late")
+    assert await slow == "late"
+    assert breaker.probing and breaker.state == "open"
+    probe.set_result("probe")
+    assert await probing == "probe"
+    assert breaker.state == "closed"
+
+
+async def test_latency_budget(monkeypatch):
+    """
+    Test whether if a payload that is not translated within its budget is
+    sent in the source language and cached once translated in the
+    background.
+    """
+    monkeypatch.setattr(TranslationAgent, "cache", MimeCache())
+    monkeypatch.setattr(TranslationAgent, "message_cache", MessageCache())
+
+    class SlowTranslator(AsyncTranslator):
+        async def translate(self, payload: str, dest_lang, src_lang):
+            await asyncio.sleep(0.05)
+            return payload.upper()
+
+    translator = SlowTranslator()
+    flags = {
+        f"translate_{x}": x == "messages"
+        for x in ("messages", "embeds", "buttons", "selects", "modals", "components")
+    }
+    _, content = await TranslationAgent.translate_payload(
+        Language.French,
+        {},
+        "Hello there",
+        source_lang=Language.English,
+        translator=translator,
+        latency_budget=0.01,
+        **flags,
+    )
+    assert content == "Hello there"
+    await asyncio.gather(*TranslationAgent.background)
+
+    _, content = await TranslationAgent.translate_payload(
+        Language.French,
+        {},
+        "Hello there",
+        source_lang=Language.English,
+        translator=translator,
+        latency_budget=0.01,
+        **flags,
+    )
+    assert content == "HELLO THERE"
+
+
+async def test_http_translator():
+    """
+    Test whether if requests of the http translator share one kept alive
+    connection and are parsed into translations.
+    """
+    peers = set()
+
+    async def handler(request: web.Request):
+        peers.add(request.transport.get_extra_info("peername"))
+        form = await request.post()
+        assert request.query["tl"] == Language.Korean.code
+        text = form["q"].upper()
+        return web.json_response([[[text[:3], ""], [text[3:], ""]]])
+
+    app = web.Application()
+    app.router.add_post("/translate", handler)
+    async with TestServer(app) as server:
+        translator = HttpTranslator(url=str(server.make_url("/translate")))
+        await translator.start()
+        for word in ("hello", "there", "friend"):
+            assert (
+                await translator.translate(word, Language.Korean, Language.English)
+                == word.upper()
+            )
+        await translator.close()
+    assert len(peers) == 1
+
+
+def catalog_dir(tmp_path):
+    for locale, messages in {
+        "fr": {"Hello there": "Bonjour", "Poll": "Sondage"},
+        "zh_CN": {"Hello there": "你好"},
+    }.items():
+        directory = tmp_path / locale / "LC_MESSAGES"
+        directory.mkdir(parents=True)
+        write_mo(str(directory / "messages.mo"), messages)
+    return str(tmp_path)
+
+
+def test_catalog_translator(tmp_path):
+    """
+    Test whether if catalogs are loaded per language and misses go to the
+    fallback translator.
+    """
+    catalog = CatalogTranslator(catalog_dir(tmp_path), fallback=MimeTranslator())
+    assert catalog.lookup("Hello there", Language.French) == "Bonjour"
+    assert catalog.lookup("Hello there", Language.ChineseSimplified) == "你好"
+    assert catalog.lookup("Hello there", Language.German) is None
+    assert catalog.batch_translate(
+        ["Poll", "Vote"], Language.French, Language.English
+    ) == ["Sondage", "Vote"]
+    assert CatalogTranslator(catalog_dir(tmp_path / "bare")).batch_translate(
+        ["Poll", "Vote"], Language.French, Language.English
+    ) == ["Sondage", ""]
+
+
+async def test_catalog_first(monkeypatch, tmp_path):
+    """
+    Test whether if the catalog is consulted for whole strings and tokens
+    before the translator.
+    """
+    monkeypatch.setattr(TranslationAgent, "cache", MimeCache())
+    monkeypatch.setattr(TranslationAgent, "message_cache", MessageCache())
+    monkeypatch.setattr(
+        TranslationAgent, "catalog", CatalogTranslator(catalog_dir(tmp_path))
+    )
+    translator = UpperTranslator()
+    agent = TranslationAgent(Language.English, Language.French, translator)
+    assert await agent.translate_many_async(
+        ["Hello there", "Vote on the **Poll**"]
+    ) == ["Bonjour", "VOTE ON THE **Sondage**"]
+    assert translator.calls == ["Vote on the"]
+
+
+async def test_tiered_translator(tmp_path):
+    """
+    Test whether if each tier only receives what the tiers before it missed,
+    slow and failing tiers are passed over and answers are cached.
+    """
+
+    class SlowTranslator(AsyncTranslator):
+        async def translate(self, payload: str, dest_lang, src_lang):
+            await asyncio.sleep(1)
+            return payload
+
+    cache = MimeCache()
+    cache.set_cache("Vote", Language.French, "Voter")
+    remote = UpperTranslator()
+    router = TieredTranslator(
+        CatalogTranslator(catalog_dir(tmp_path)),
+        Tier(CacheTranslator(cache), name="cache"),
+        Tier(SlowTranslator(), timeout=0.01, name="local"),
+        Tier(FailingTranslator(), name="broken"),
+        Tier(remote, name="remote"),
+    )
+    assert await router.batch_translate(
+        ["Poll", "Vote", "Results"], Language.French, Language.English
+    ) == ["Sondage", "Voter", "RESULTS"]
+    assert remote.calls == ["Results"]
+    assert cache.get_cache("Results", Language.French) == "RESULTS"
+
+    stats = router.stats()
+    assert stats["CatalogTranslator"]["hits"] == 1
+    assert stats["cache"] == {**stats["cache"], "hits": 1, "misses": 1}
+    assert stats["local"]["timeouts"] == 1
+    assert stats["broken"]["errors"] == 1
+    assert stats["remote"]["hits"] == 1
+
+
+async def test_tiered_agent(monkeypatch):
+    """
+    Test whether if the agent leaves the cache to a router with a cache tier
+    so that the tier hits and answers are cached once.
+    """
+
+    class CountingCache(MimeCache):
+        def __init__(self) -> None:
+            super().__init__()
+            self.writes = 0
+
+        def set_cache(self, src, lang, translated):
+            self.writes += 1
+            super().set_cache(src, lang, translated)
+
+    cache = CountingCache()
+    monkeypatch.setattr(TranslationAgent, "cache", cache)
+    monkeypatch.setattr(TranslationAgent, "message_cache", MessageCache())
+    remote = UpperTranslator()
+    router = TieredTranslator(Tier(CacheTranslator(), name="cache"), remote)
+    agent = TranslationAgent(Language.English, Language.French, router)
+    assert await agent.translate_async("Vote **now**") == "VOTE **NOW**"
+    assert cache.writes == 2
+    agent.message_cache.clear()
+    assert await agent.translate_async("Vote **now**") == "VOTE **NOW**"
+    assert sorted(remote.calls) == ["Vote", "now"]
+    assert router.stats()["cache"]["hits"] == 2
+    assert cache.writes == 2
@@ -1,9 +1,10 @@
 from string import printable
+from struct import pack
 from random import choice, randint, random
-from typing import Any
+from typing import Any, Dict
 
 from discord.ext.i18n.language import Language
-from discord.ext.i18n.preprocess import Translator
+from discord.ext.i18n.preprocess import AsyncTranslator, Translator
 from discord.ext.i18n.cache import Cache
 
 
@@ -34,6 +35,9 @@ class MimeCache(Cache):
     async def load_cache(self):
         pass
 
+    def load_cache_sync(self):
+        pass
+
     async def save_cache(self):
         pass
 
@@ -52,3 +56,38 @@ class MimeCache(Cache):
 
 def generate_long_num(place: int):
     return int(random() * (10 ** place))
+
+
+class UpperTranslator(AsyncTranslator):
+    def __init__(self) -> None:
+        self.calls = []
+
+    async def translate(self, payload: str, dest_lang, src_lang):
+        self.calls.append(payload)
+        return payload.upper()
+
+
+class FailingTranslator(AsyncTranslator):
+    async def translate(self, payload: str, dest_lang, src_lang):
+        raise ConnectionError("backend unavailable")
+
+
+def write_mo(pth: str, messages: Dict[str, str]):
+    """
+    Compiles messages into a gettext .mo catalog like `msgfmt` does.
+    """
+    messages = {"": "Content-Type: text/plain; charset=UTF-8\n", **messages}
+    keys = sorted(messages)
+    ids = [key.encode("utf-8") for key in keys]
+    strs = [messages[key].encode("utf-8") for key in keys]
+    start = 7 * 4 + 16 * len(keys)
+    offsets = []
+    for data in ids + strs:
+        offsets.append((len(data), start))
+        start += len(data) + 1
+    with open(pth, "wb") as f:
+        f.write(pack("<7I", 0x950412DE, 0, len(keys), 28, 28 + 8 * len(keys), 0, 0))
+        for length, offset in offsets:
+            f.write(pack("<2I", length, offset))
+        for data in ids + strs:
+            f.write(data + b"\0")